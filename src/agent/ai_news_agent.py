@@ -6,13 +6,18 @@ Author: zengzhengtx
 """
 
 import json
+import heapq
 import asyncio
-from typing import List, Dict, Any, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from operator import attrgetter
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 
 from smolagents import CodeAgent, LiteLLMModel
 
-from src.agent.config import load_config
+from src.agent.config import load_config, AppConfig
 from src.tools.web_search import WebSearchTool
 from src.tools.arxiv_search import ArxivSearchTool
 from src.tools.huggingface_news import HuggingFaceNewsTool
@@ -23,19 +28,29 @@ from src.tools.base_tool import NewsItem
 from src.utils.validators import ContentFilter
 from src.utils.quality_control import QualityController
 from src.database.database import DatabaseManager
-from src.database.models import Article
+from src.database.models import Article, encode_tags
 from src.utils.logger import get_logger
 
 
+# 并发收集资讯时检查停止信号的间隔（秒）
+SOURCE_POLL_INTERVAL = 0.5
+
+
 class AINewsAgent:
     """AI资讯智能体"""
     
-    def __init__(self, config_path: str = "config.yaml"):
-        self.config = load_config(config_path)
+    def __init__(
+        self,
+        config_path: str = "config.yaml",
+        config: Optional[AppConfig] = None,
+        db_manager: Optional[DatabaseManager] = None
+    ):
+        # 调用方已加载配置时直接共享，避免重复解析配置文件
+        self.config = config if config is not None else load_config(config_path)
         self.logger = get_logger()
         
-        # 初始化数据库
-        self.db_manager = DatabaseManager(self.config.database_path)
+        # 初始化数据库（调用方已创建时直接共享，复用其连接且不重复初始化表结构）
+        self.db_manager = db_manager if db_manager is not None else DatabaseManager(self.config.database_path)
         
         # 初始化工具
         self._init_tools()
@@ -95,10 +110,34 @@ class AINewsAgent:
         
         self.logger.info("智能体初始化完成")
     
-    def run_news_collection(self) -> List[Article]:
+    def reconfigure(self, config: Optional[AppConfig] = None) -> None:
+        """
+        应用更新后的配置
+        
+        只重建依赖API密钥和模型的组件，资讯获取工具和数据库连接保持不变
+        
+        Args:
+            config: 新配置，为None时使用当前（已被修改的）配置对象
+        """
+        if config is not None:
+            self.config = config
+        
+        self.content_rewriter = ContentRewriteTool(api_key=self.config.openai_api_key)
+        self._init_agent()
+        
+        self.content_filter.duplicate_threshold = self.config.content.duplicate_threshold
+        self.content_filter.min_quality_score = self.config.content.min_quality_score
+        self.quality_controller.min_quality_score = self.config.content.min_quality_score
+        
+        self.logger.info("智能体配置已更新")
+    
+    def run_news_collection(self, stop_event: Optional[threading.Event] = None) -> List[Article]:
         """
         运行资讯收集流程
         
+        Args:
+            stop_event: 停止信号，在收集资讯期间及改写前检查
+        
         Returns:
             List[Article]: 生成的文章列表
         """
@@ -106,9 +145,13 @@ class AINewsAgent:
         
         try:
             # 1. 获取资讯
-            news_items = self._collect_news()
+            news_items = self._collect_news(stop_event)
             self.logger.info(f"收集到 {len(news_items)} 条原始资讯")
             
+            if self._stop_requested(stop_event):
+                self.logger.info("收到停止信号，资讯收集流程已中止")
+                return []
+            
             # 2. 筛选和去重
             filtered_items = self.content_filter.filter_and_dedupe(news_items)
             self.logger.info(f"筛选后剩余 {len(filtered_items)} 条资讯")
@@ -117,6 +160,10 @@ class AINewsAgent:
             selected_items = self._select_best_news(filtered_items)
             self.logger.info(f"选择了 {len(selected_items)} 条优质资讯")
             
+            if self._stop_requested(stop_event):
+                self.logger.info("收到停止信号，资讯收集流程已中止")
+                return []
+            
             # 4. 改写内容
             rewritten_items = self._rewrite_news(selected_items)
             self.logger.info(f"改写了 {len(rewritten_items)} 条资讯")
@@ -139,118 +186,112 @@ class AINewsAgent:
             self.logger.error(f"资讯收集流程失败: {e}")
             raise
     
-    def _collect_news(self) -> List[NewsItem]:
-        """收集资讯"""
-        all_news = []
-        
-        try:
-            # Web搜索
-            if self.config.sources.web_search.enabled:
-                self.logger.info("开始Web搜索...")
-                web_results = json.loads(self.web_search_tool.forward(
-                    queries=self.config.sources.web_search.queries,
-                    max_results_per_query=self.config.sources.web_search.max_results_per_query
-                ))
-                
-                for result in web_results:
-                    news_item = NewsItem(
-                        title=result['title'],
-                        content=result['content'],
-                        url=result['url'],
-                        source=result['source'],
-                        published_date=datetime.fromisoformat(result['published_date']),
-                        tags=result.get('tags', []),
-                        score=result.get('score', 0.0)
-                    )
-                    all_news.append(news_item)
-        
-        except Exception as e:
-            self.logger.error(f"Web搜索失败: {e}")
-        
-        try:
-            # arXiv搜索
-            if self.config.sources.arxiv.enabled:
-                self.logger.info("开始arXiv搜索...")
-                arxiv_results = json.loads(self.arxiv_tool.forward(
-                    categories=self.config.sources.arxiv.categories,
-                    max_papers=self.config.sources.arxiv.max_papers,
-                    days_back=self.config.sources.arxiv.days_back
-                ))
-                
-                for result in arxiv_results:
-                    news_item = NewsItem(
-                        title=result['title'],
-                        content=result['content'],
-                        url=result['url'],
-                        source=result['source'],
-                        published_date=datetime.fromisoformat(result['published_date']),
-                        tags=result.get('tags', []),
-                        score=result.get('score', 0.0)
-                    )
-                    all_news.append(news_item)
-        
-        except Exception as e:
-            self.logger.error(f"arXiv搜索失败: {e}")
+    def _stop_requested(self, stop_event: Optional[threading.Event]) -> bool:
+        """检查是否收到停止信号"""
+        return stop_event is not None and stop_event.is_set()
+    
+    def _collect_news(self, stop_event: Optional[threading.Event] = None) -> List[NewsItem]:
+        """收集资讯（各资讯源互不依赖，并发请求）"""
+        sources = self.config.sources
+        fetchers = []
+        
+        # Web搜索
+        if sources.web_search.enabled:
+            fetchers.append(("Web搜索", partial(
+                self.web_search_tool.forward,
+                queries=sources.web_search.queries,
+                max_results_per_query=sources.web_search.max_results_per_query
+            )))
+        
+        # arXiv搜索
+        if sources.arxiv.enabled:
+            fetchers.append(("arXiv搜索", partial(
+                self.arxiv_tool.forward,
+                categories=sources.arxiv.categories,
+                max_papers=sources.arxiv.max_papers,
+                days_back=sources.arxiv.days_back
+            )))
+        
+        # Hugging Face搜索
+        if sources.huggingface.enabled:
+            fetchers.append(("Hugging Face搜索", partial(
+                self.huggingface_tool.forward,
+                max_items=sources.huggingface.max_items,
+                trending_period=sources.huggingface.trending_period
+            )))
+        
+        # GitHub搜索
+        if sources.github.enabled:
+            fetchers.append(("GitHub搜索", partial(
+                self.github_tool.forward,
+                topics=sources.github.topics,
+                max_repos=sources.github.max_repos,
+                min_stars=sources.github.min_stars
+            )))
+        
+        if not fetchers or self._stop_requested(stop_event):
+            return []
+        
+        executor = ThreadPoolExecutor(max_workers=len(fetchers), thread_name_prefix="news-source")
+        futures = {
+            executor.submit(self._fetch_source, name, fetch): index
+            for index, (name, fetch) in enumerate(fetchers)
+        }
+        results: Dict[int, List[NewsItem]] = {}
         
         try:
-            # Hugging Face搜索
-            if self.config.sources.huggingface.enabled:
-                self.logger.info("开始Hugging Face搜索...")
-                hf_results = json.loads(self.huggingface_tool.forward(
-                    max_items=self.config.sources.huggingface.max_items,
-                    trending_period=self.config.sources.huggingface.trending_period
-                ))
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=SOURCE_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[futures[future]] = future.result()
                 
-                for result in hf_results:
-                    news_item = NewsItem(
-                        title=result['title'],
-                        content=result['content'],
-                        url=result['url'],
-                        source=result['source'],
-                        published_date=datetime.fromisoformat(result['published_date']),
-                        tags=result.get('tags', []),
-                        score=result.get('score', 0.0)
-                    )
-                    all_news.append(news_item)
+                # 收到停止信号时不再等待仍在请求中的资讯源
+                if self._stop_requested(stop_event):
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # 按资讯源顺序合并，与串行收集时的顺序一致
+        return [item for index in sorted(results) for item in results[index]]
+    
+    def _fetch_source(self, name: str, fetch: Callable[[], str]) -> List[NewsItem]:
+        """
+        请求单个资讯源并转换为资讯项
         
-        except Exception as e:
-            self.logger.error(f"Hugging Face搜索失败: {e}")
+        Args:
+            name: 资讯源名称（用于日志）
+            fetch: 返回JSON结果的请求函数
+            
+        Returns:
+            List[NewsItem]: 资讯项列表，请求失败时为空
+        """
+        news_items = []
         
         try:
-            # GitHub搜索
-            if self.config.sources.github.enabled:
-                self.logger.info("开始GitHub搜索...")
-                github_results = json.loads(self.github_tool.forward(
-                    topics=self.config.sources.github.topics,
-                    max_repos=self.config.sources.github.max_repos,
-                    min_stars=self.config.sources.github.min_stars
-                ))
-                
-                for result in github_results:
-                    news_item = NewsItem(
-                        title=result['title'],
-                        content=result['content'],
-                        url=result['url'],
-                        source=result['source'],
-                        published_date=datetime.fromisoformat(result['published_date']),
-                        tags=result.get('tags', []),
-                        score=result.get('score', 0.0)
-                    )
-                    all_news.append(news_item)
+            self.logger.info(f"开始{name}...")
+            for result in json.loads(fetch()):
+                news_item = NewsItem(
+                    title=result['title'],
+                    content=result['content'],
+                    url=result['url'],
+                    source=result['source'],
+                    published_date=datetime.fromisoformat(result['published_date']),
+                    tags=result.get('tags', []),
+                    score=result.get('score', 0.0)
+                )
+                news_items.append(news_item)
         
         except Exception as e:
-            self.logger.error(f"GitHub搜索失败: {e}")
+            self.logger.error(f"{name}失败: {e}")
         
-        return all_news
+        return news_items
     
     def _select_best_news(self, news_items: List[NewsItem]) -> List[NewsItem]:
         """选择最佳资讯"""
-        # 按分数排序
-        sorted_items = sorted(news_items, key=lambda x: x.score, reverse=True)
-        
-        # 选择前N条
+        # 按分数选择前N条（部分选择，结果与完整排序后切片一致，同分保持原顺序）
         max_articles = self.config.agent.max_articles_per_run
-        selected_items = sorted_items[:max_articles]
+        selected_items = heapq.nlargest(max_articles, news_items, key=attrgetter('score'))
         
         return selected_items
     
@@ -276,16 +317,11 @@ class AINewsAgent:
             try:
                 formatted_content = self.wechat_formatter.format_news_item(item)
                 
-                # 创建新的NewsItem
-                formatted_item = NewsItem(
-                    title=item.title,
+                # 复制资讯项并替换内容（保留分数和摘要）
+                formatted_item = item.replace(
                     content=formatted_content,
-                    url=item.url,
-                    source=item.source,
-                    published_date=item.published_date,
                     tags=item.tags + ["formatted"]
                 )
-                formatted_item.score = item.score
                 
                 formatted_items.append(formatted_item)
             except Exception as e:
@@ -324,8 +360,8 @@ class AINewsAgent:
         
         for item in news_items:
             try:
-                # 生成摘要
-                summary = self.content_rewriter.generate_summary(item.content)
+                # 优先复用改写阶段生成的摘要，避免重复调用API
+                summary = item.summary or self.content_rewriter.generate_summary(item.content)
                 
                 # 创建文章对象
                 article = Article(
@@ -336,17 +372,20 @@ class AINewsAgent:
                     source_type=item.source,
                     status='draft',
                     quality_score=item.score,
-                    tags=json.dumps(item.tags, ensure_ascii=False)
+                    tags=encode_tags(item.tags)
                 )
                 
-                # 保存到数据库
-                article_id = self.db_manager.save_article(article)
-                article.id = article_id
-                
                 articles.append(article)
                 
             except Exception as e:
-                self.logger.error(f"保存文章失败: {e}")
+                self.logger.error(f"生成文章失败: {e}")
+        
+        # 单个事务批量保存到数据库
+        try:
+            self.db_manager.save_articles(articles)
+        except Exception as e:
+            self.logger.error(f"保存文章失败: {e}")
+            return []
         
         return articles
     
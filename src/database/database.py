@@ -7,6 +7,8 @@ Author: zengzhengtx
 
 import sqlite3
 import json
+import threading
+import weakref
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Tuple
 from contextlib import contextmanager
@@ -15,33 +17,95 @@ from src.database.models import Article, NewsSource, Config, init_database, migr
 from src.utils.logger import get_logger
 
 
+class _ThreadConnection:
+    """线程局部存储持有的数据库连接，线程结束、局部存储释放时随之关闭连接"""
+    
+    __slots__ = ('conn', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+    
+    def __del__(self):
+        self.conn.close()
+
+
 class DatabaseManager:
     """数据库管理器"""
     
+    # 每个连接建立时执行一次的性能参数
+    CONNECTION_PRAGMAS = [
+        "PRAGMA journal_mode = WAL",      # 读写并发：智能体写入时界面仍可读取
+        "PRAGMA synchronous = NORMAL",    # WAL模式下兼顾安全与写入性能
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -65536",     # 64MB页缓存
+    ]
+    
+    # 全文搜索索引（trigram分词）可匹配的最短关键词长度
+    SEARCH_INDEX_MIN_KEYWORD_LENGTH = 3
+    
+    # 批量新增文章时写入的列
+    ARTICLE_INSERT_COLUMNS = (
+        "title", "content", "summary", "source_url", "source_type",
+        "status", "quality_score", "tags", "created_at", "updated_at"
+    )
+    # 每条多行INSERT语句包含的文章数（旧版SQLite单语句最多999个参数）
+    ARTICLE_INSERT_PAGE_SIZE = 999 // len(ARTICLE_INSERT_COLUMNS)
+    
     def __init__(self, db_path: str):
         self.db_path = db_path
         self.logger = get_logger()
         
+        # 每个线程复用一个持久连接（sqlite3连接不宜跨线程共享事务）；
+        # 连接只由线程局部存储强引用，这里弱引用登记，供close()关闭仍存活线程的连接
+        self._local = threading.local()
+        self._connections: weakref.WeakSet = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
+        
         # 初始化数据库
         init_database(db_path)
         migrate_database(db_path)
+        
+        # 全文搜索索引是否可用（取决于SQLite是否支持FTS5 trigram分词）
+        with self.get_connection() as conn:
+            self._search_index_enabled = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'"
+            ).fetchone() is not None
+    
+    def _connect(self) -> _ThreadConnection:
+        """创建新连接并应用性能参数"""
+        conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        
+        thread_conn = _ThreadConnection(conn)
+        with self._connections_lock:
+            self._connections.add(thread_conn)
+        return thread_conn
     
     @contextmanager
     def get_connection(self):
-        """获取数据库连接（上下文管理器）"""
-        conn = None
+        """获取当前线程的持久数据库连接（上下文管理器）"""
+        thread_conn = getattr(self._local, 'thread_conn', None)
+        if thread_conn is None:
+            thread_conn = self._connect()
+            self._local.thread_conn = thread_conn
+        conn = thread_conn.conn
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
             yield conn
         except Exception as e:
-            if conn:
-                conn.rollback()
+            conn.rollback()
             self.logger.error(f"数据库操作失败: {e}")
             raise
-        finally:
-            if conn:
-                conn.close()
+    
+    def close(self) -> None:
+        """关闭所有线程的持久连接"""
+        with self._connections_lock:
+            for thread_conn in list(self._connections):
+                thread_conn.conn.close()
+            self._connections.clear()
+        self._local = threading.local()
     
     # ==================== 文章操作 ====================
     
@@ -91,6 +155,52 @@ class DatabaseManager:
             self.logger.info(f"文章已保存: ID={article.id}, 标题='{article.title[:50]}...'")
             return article.id
     
+    def save_articles(self, articles: List[Article]) -> List[int]:
+        """
+        批量新增文章（单个事务）
+        
+        Args:
+            articles: 文章对象列表（均为未保存的新文章）
+            
+        Returns:
+            List[int]: 文章ID列表，顺序与输入一致
+        """
+        if not articles:
+            return []
+        
+        row_placeholder = f"({', '.join('?' * len(self.ARTICLE_INSERT_COLUMNS))})"
+        insert_prefix = f"INSERT INTO articles ({', '.join(self.ARTICLE_INSERT_COLUMNS)}) VALUES "
+        
+        article_ids: List[int] = []
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            # 按页生成多行VALUES语句，每页只需一次语句执行
+            for start in range(0, len(articles), self.ARTICLE_INSERT_PAGE_SIZE):
+                page = articles[start:start + self.ARTICLE_INSERT_PAGE_SIZE]
+                params = []
+                for article in page:
+                    params.extend((
+                        article.title, article.content, article.summary,
+                        article.source_url, article.source_type, article.status,
+                        article.quality_score, article.tags,
+                        article.created_at.isoformat(), article.updated_at.isoformat()
+                    ))
+                
+                cursor.execute(insert_prefix + ", ".join([row_placeholder] * len(page)), params)
+                
+                # 同一写事务内自增ID连续分配，由本页最后一个ID倒推本页ID
+                last_id = cursor.lastrowid
+                article_ids.extend(range(last_id - len(page) + 1, last_id + 1))
+            
+            conn.commit()
+        
+        for article, article_id in zip(articles, article_ids):
+            article.id = article_id
+        
+        self.logger.info(f"批量保存文章: {len(articles)} 篇, ID={article_ids[0]}-{article_ids[-1]}")
+        return article_ids
+    
     def get_article(self, article_id: int) -> Optional[Article]:
         """
         获取文章
@@ -147,6 +257,56 @@ class DatabaseManager:
             
             return [self._row_to_article(row) for row in rows]
     
+    def list_articles_projection(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50
+    ) -> List[sqlite3.Row]:
+        """
+        获取文章列表的展示字段（不加载正文）
+        
+        Args:
+            status: 文章状态过滤
+            limit: 限制数量
+            
+        Returns:
+            List[sqlite3.Row]: 包含id、title、status、source_type、created_at、quality_score的行
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            sql = "SELECT id, title, status, source_type, created_at, quality_score FROM articles"
+            params = []
+            
+            if status:
+                sql += " WHERE status = ?"
+                params.append(status)
+            
+            sql += " ORDER BY created_at DESC LIMIT ?"
+            params.append(limit)
+            
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+    
+    def source_counts(self, limit: int = 100) -> Dict[str, int]:
+        """
+        统计最近文章的来源分布
+        
+        Args:
+            limit: 参与统计的最近文章数量
+            
+        Returns:
+            Dict[str, int]: 来源到文章数量的映射
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT COALESCE(NULLIF(source_type, ''), '未知来源'), COUNT(*)
+                FROM (SELECT source_type FROM articles ORDER BY created_at DESC LIMIT ?)
+                GROUP BY 1
+            """, (limit,))
+            return dict(cursor.fetchall())
+    
     def delete_article(self, article_id: int) -> bool:
         """
         删除文章
@@ -180,12 +340,24 @@ class DatabaseManager:
         """
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT * FROM articles 
-                WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%", limit))
+            
+            # trigram索引只能匹配至少3个字符的关键词，更短的关键词仍逐行LIKE匹配
+            if self._search_index_enabled and len(keyword) >= self.SEARCH_INDEX_MIN_KEYWORD_LENGTH:
+                phrase = '"' + keyword.replace('"', '""') + '"'
+                cursor.execute("""
+                    SELECT articles.* FROM articles_fts
+                    JOIN articles ON articles.id = articles_fts.rowid
+                    WHERE articles_fts MATCH ?
+                    ORDER BY articles.created_at DESC
+                    LIMIT ?
+                """, (phrase, limit))
+            else:
+                cursor.execute("""
+                    SELECT * FROM articles 
+                    WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                """, (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%", limit))
             
             rows = cursor.fetchall()
             return [self._row_to_article(row) for row in rows]
@@ -199,31 +371,20 @@ class DatabaseManager:
         """
         try:
             with self.get_connection() as conn:
-                conn.execute("PRAGMA busy_timeout = 10000")  # 10秒超时
                 cursor = conn.cursor()
 
-                stats = {}
-
-                # 总文章数
-                cursor.execute("SELECT COUNT(*) FROM articles")
-                result = cursor.fetchone()
-                stats['total'] = result[0] if result else 0
-
-                # 按状态统计
+                # 读取触发器维护的计数表，行数只与状态数和天数相关，无需扫描文章表
+                # （计数表以空字符串记录NULL状态，还原为None后与直接统计文章表的结果一致）
                 cursor.execute("""
-                    SELECT status, COUNT(*) FROM articles GROUP BY status
+                    SELECT NULLIF(status, ''), SUM(count), SUM(CASE WHEN day = DATE('now') THEN count ELSE 0 END)
+                    FROM article_counts GROUP BY status HAVING SUM(count) > 0
                 """)
-                for row in cursor.fetchall():
-                    if row and len(row) >= 2:
-                        stats[f"status_{row[0]}"] = row[1]
 
-                # 今日新增
-                cursor.execute("""
-                    SELECT COUNT(*) FROM articles
-                    WHERE DATE(created_at) = DATE('now')
-                """)
-                result = cursor.fetchone()
-                stats['today'] = result[0] if result else 0
+                stats = {'total': 0, 'today': 0}
+                for status, count, today in cursor.fetchall():
+                    stats[f"status_{status}"] = count
+                    stats['total'] += count
+                    stats['today'] += today or 0
 
                 self.logger.info(f"数据库统计查询成功: {stats}")
                 return stats
@@ -6,6 +6,7 @@ Author: zengzhengtx
 """
 
 import sqlite3
+import json
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, asdict
@@ -14,6 +15,23 @@ from pathlib import Path
 from src.utils.logger import get_logger
 
 
+# 复用同一个编码器实例，json.dumps传入非默认参数时每次都会新建编码器
+_TAGS_ENCODER = json.JSONEncoder(ensure_ascii=False)
+
+
+def encode_tags(tags: List[str]) -> str:
+    """
+    将标签列表编码为Article.tags存储的JSON字符串
+    
+    Args:
+        tags: 标签列表
+        
+    Returns:
+        str: JSON字符串（保留中文字符）
+    """
+    return _TAGS_ENCODER.encode(tags)
+
+
 @dataclass
 class Article:
     """文章数据模型"""
@@ -152,6 +170,17 @@ class DatabaseSchema:
     )
     """
     
+    # 文章计数表：按状态和创建日期汇总，由触发器维护，统计时无需扫描文章表。
+    # 文章状态为NULL、创建时间为NULL或无法解析时，对应键记为空字符串，仍计入总数
+    CREATE_ARTICLE_COUNTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS article_counts (
+        status TEXT NOT NULL,
+        day TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (status, day)
+    )
+    """
+    
     # 索引
     CREATE_INDEXES = [
         "CREATE INDEX IF NOT EXISTS idx_articles_status ON articles(status)",
@@ -162,19 +191,90 @@ class DatabaseSchema:
         "CREATE INDEX IF NOT EXISTS idx_news_sources_fetched_at ON news_sources(fetched_at)"
     ]
     
+    # 触发器：文章增删及状态/创建时间变更时同步更新计数表
+    CREATE_TRIGGERS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_articles_count_insert AFTER INSERT ON articles
+        BEGIN
+            INSERT INTO article_counts (status, day, count)
+            VALUES (COALESCE(NEW.status, ''), COALESCE(DATE(NEW.created_at), ''), 1)
+            ON CONFLICT (status, day) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_articles_count_delete AFTER DELETE ON articles
+        BEGIN
+            UPDATE article_counts SET count = count - 1
+            WHERE status = COALESCE(OLD.status, '') AND day = COALESCE(DATE(OLD.created_at), '');
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_articles_count_update AFTER UPDATE OF status, created_at ON articles
+        WHEN OLD.status IS NOT NEW.status OR DATE(OLD.created_at) IS NOT DATE(NEW.created_at)
+        BEGIN
+            UPDATE article_counts SET count = count - 1
+            WHERE status = COALESCE(OLD.status, '') AND day = COALESCE(DATE(OLD.created_at), '');
+            INSERT INTO article_counts (status, day, count)
+            VALUES (COALESCE(NEW.status, ''), COALESCE(DATE(NEW.created_at), ''), 1)
+            ON CONFLICT (status, day) DO UPDATE SET count = count + 1;
+        END
+        """
+    ]
+    
+    # 全文搜索索引：外部内容FTS5表，trigram分词支持中文子串匹配（需SQLite 3.34+）
+    CREATE_SEARCH_INDEX = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, content, summary,
+        content='articles', content_rowid='id', tokenize='trigram'
+    )
+    """
+    
+    # 触发器：文章增删改时同步全文搜索索引
+    SEARCH_INDEX_TRIGGERS = [
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_articles_fts_insert AFTER INSERT ON articles
+        BEGIN
+            INSERT INTO articles_fts (rowid, title, content, summary)
+            VALUES (NEW.id, NEW.title, NEW.content, NEW.summary);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_articles_fts_delete AFTER DELETE ON articles
+        BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content, summary)
+            VALUES ('delete', OLD.id, OLD.title, OLD.content, OLD.summary);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_articles_fts_update AFTER UPDATE OF title, content, summary ON articles
+        BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content, summary)
+            VALUES ('delete', OLD.id, OLD.title, OLD.content, OLD.summary);
+            INSERT INTO articles_fts (rowid, title, content, summary)
+            VALUES (NEW.id, NEW.title, NEW.content, NEW.summary);
+        END
+        """
+    ]
+    
     @classmethod
     def get_all_tables(cls) -> List[str]:
         """获取所有建表语句"""
         return [
             cls.CREATE_ARTICLES_TABLE,
             cls.CREATE_NEWS_SOURCES_TABLE,
-            cls.CREATE_CONFIG_TABLE
+            cls.CREATE_CONFIG_TABLE,
+            cls.CREATE_ARTICLE_COUNTS_TABLE
         ]
     
     @classmethod
     def get_all_indexes(cls) -> List[str]:
         """获取所有索引语句"""
         return cls.CREATE_INDEXES
+    
+    @classmethod
+    def get_all_triggers(cls) -> List[str]:
+        """获取所有触发器语句"""
+        return cls.CREATE_TRIGGERS
 
 
 def init_database(db_path: str) -> None:
@@ -203,6 +303,16 @@ def init_database(db_path: str) -> None:
         for index_sql in DatabaseSchema.get_all_indexes():
             cursor.execute(index_sql)
         
+        # 创建触发器
+        for trigger_sql in DatabaseSchema.get_all_triggers():
+            cursor.execute(trigger_sql)
+        
+        # 创建全文搜索索引（SQLite不支持FTS5/trigram时退回LIKE搜索）
+        try:
+            _create_search_index(cursor)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"全文搜索索引不可用，将使用LIKE搜索: {e}")
+        
         # 提交更改
         conn.commit()
         conn.close()
@@ -214,6 +324,24 @@ def init_database(db_path: str) -> None:
         raise
 
 
+def _create_search_index(cursor: sqlite3.Cursor) -> None:
+    """
+    创建全文搜索索引及同步触发器，首次创建时按已有文章建立索引
+    
+    Args:
+        cursor: 数据库游标
+    """
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'")
+    index_exists = cursor.fetchone() is not None
+    
+    cursor.execute(DatabaseSchema.CREATE_SEARCH_INDEX)
+    for trigger_sql in DatabaseSchema.SEARCH_INDEX_TRIGGERS:
+        cursor.execute(trigger_sql)
+    
+    if not index_exists:
+        cursor.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+
 def check_database_version(db_path: str) -> str:
     """
     检查数据库版本
@@ -264,6 +392,27 @@ def update_database_version(db_path: str, version: str) -> None:
         logger.error(f"更新数据库版本失败: {e}")
 
 
+def rebuild_article_counts(db_path: str) -> None:
+    """
+    根据文章表重建文章计数表（用于计数表引入前创建的数据库）
+    
+    Args:
+        db_path: 数据库文件路径
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            conn.execute("DELETE FROM article_counts")
+            conn.execute("""
+                INSERT INTO article_counts (status, day, count)
+                SELECT COALESCE(status, ''), COALESCE(DATE(created_at), ''), COUNT(*)
+                FROM articles
+                GROUP BY 1, 2
+            """)
+    finally:
+        conn.close()
+
+
 def migrate_database(db_path: str) -> None:
     """
     数据库迁移
@@ -273,7 +422,7 @@ def migrate_database(db_path: str) -> None:
     """
     logger = get_logger()
     current_version = check_database_version(db_path)
-    target_version = "1.0.0"
+    target_version = "1.1.0"
     
     if current_version == target_version:
         logger.info(f"数据库版本已是最新: {current_version}")
@@ -281,8 +430,8 @@ def migrate_database(db_path: str) -> None:
     
     logger.info(f"开始数据库迁移: {current_version} -> {target_version}")
     
-    # 这里可以添加具体的迁移逻辑
-    # 例如：添加新字段、修改表结构等
+    # 1.1.0: 新增由触发器维护的文章计数表，需按已有文章回填
+    rebuild_article_counts(db_path)
     
     # 更新版本号
     update_database_version(db_path, target_version)
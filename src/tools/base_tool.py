@@ -5,11 +5,13 @@
 Author: zengzhengtx
 """
 
+import sys
 import time
 import hashlib
 import pickle
 import os
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -19,8 +21,27 @@ from src.utils.logger import get_logger
 from src.utils.datetime_utils import normalize_datetime, get_utc_now
 
 
+@lru_cache(maxsize=65536)
+def _derive_id(title: str, url: str) -> str:
+    """
+    由标题和URL生成资讯项ID（同一资讯在各刷新周期中反复出现，结果按输入缓存）
+
+    Args:
+        title: 标题
+        url: 链接
+
+    Returns:
+        str: 16位十六进制ID
+    """
+    # 8字节blake2b摘要，十六进制恰为16位，与原ID长度一致
+    return hashlib.blake2b(f"{title}{url}".encode('utf-8'), digest_size=8).hexdigest()
+
+
 class NewsItem:
     """资讯项数据类"""
+
+    # 资讯项在流水线中大量创建，固定属性以省去每个实例的__dict__
+    __slots__ = ('title', 'content', 'url', 'source', 'published_date', 'tags', 'score', 'summary', 'id')
     
     def __init__(
         self,
@@ -30,23 +51,58 @@ class NewsItem:
         source: str,
         published_date: Optional[datetime] = None,
         tags: Optional[List[str]] = None,
-        score: float = 0.0
+        score: float = 0.0,
+        summary: Optional[str] = None
     ):
         self.title = title
         self.content = content
         self.url = url
-        self.source = source
+        self.source = sys.intern(source)  # 来源取值很少，驻留后各资讯项共享同一字符串
         self.published_date = normalize_datetime(published_date) or get_utc_now()
         self.tags = tags or []
         self.score = score
+        self.summary = summary  # 改写阶段生成的摘要，后续阶段直接复用
         self.id = self._generate_id()
     
     def _generate_id(self) -> str:
         """生成唯一ID"""
-        content_hash = hashlib.md5(
-            f"{self.title}{self.url}".encode('utf-8')
-        ).hexdigest()
-        return content_hash[:16]
+        return _derive_id(self.title, self.url)
+    
+    def replace(self, **changes: Any) -> 'NewsItem':
+        """
+        复制资讯项并替换指定字段
+        
+        直接复制各属性而不重新执行构造函数；标题和URL未变时沿用原ID，不重新计算哈希。
+        原资讯项保持不变（质量验证需要对比原始内容）
+        
+        Args:
+            **changes: 需要替换的字段及新值
+            
+        Returns:
+            NewsItem: 新的资讯项
+            
+        Raises:
+            TypeError: 字段名不存在时（与dataclasses.replace一致，避免拼写错误被静默忽略）
+        """
+        unknown_fields = changes.keys() - set(self.__slots__)
+        if unknown_fields:
+            raise TypeError(f"NewsItem没有字段: {', '.join(sorted(unknown_fields))}")
+        
+        new_item = object.__new__(self.__class__)
+        for name in self.__slots__:
+            setattr(new_item, name, changes.get(name, getattr(self, name)))
+        
+        # 标签列表是可变对象，未替换时复制一份，避免修改新资讯项的标签影响原资讯项
+        if 'tags' not in changes:
+            new_item.tags = list(self.tags)
+        if 'source' in changes:
+            new_item.source = sys.intern(new_item.source)
+        if 'published_date' in changes:
+            new_item.published_date = normalize_datetime(new_item.published_date) or get_utc_now()
+        if 'title' in changes or 'url' in changes:
+            new_item.id = new_item._generate_id()
+        
+        return new_item
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -58,7 +114,8 @@ class NewsItem:
             'source': self.source,
             'published_date': self.published_date.isoformat(),
             'tags': self.tags,
-            'score': self.score
+            'score': self.score,
+            'summary': self.summary
         }
     
     @classmethod
@@ -75,7 +132,8 @@ class NewsItem:
             source=data['source'],
             published_date=published_date,
             tags=data.get('tags', []),
-            score=data.get('score', 0.0)
+            score=data.get('score', 0.0),
+            summary=data.get('summary')
         )
     
     def __str__(self) -> str:
@@ -96,7 +154,7 @@ class CacheManager:
     
     def _get_cache_path(self, key: str) -> Path:
         """获取缓存文件路径"""
-        safe_key = hashlib.md5(key.encode('utf-8')).hexdigest()
+        safe_key = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
         return self.cache_dir / f"{safe_key}.cache"
     
     def get(self, key: str) -> Optional[Any]:
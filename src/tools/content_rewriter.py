@@ -7,10 +7,11 @@ Author: zengzhengtx
 
 import json
 import time
+import hashlib
 from typing import Dict, Any, List, Optional
 import openai
 
-from src.tools.base_tool import BaseNewsTool, NewsItem
+from src.tools.base_tool import BaseNewsTool, NewsItem, CacheManager
 from src.utils.logger import get_logger
 
 
@@ -39,12 +40,17 @@ class ContentRewriteTool:
     }
     output_type = "string"
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache_manager: Optional[CacheManager] = None):
         self.logger = get_logger()
         self.api_key = api_key
         self.client = openai.OpenAI(api_key=api_key)
         self.rate_limit_delay = 1.0
         self.last_request_time = 0
+        
+        # 相同提示词的API结果缓存，重复改写同一内容时无需再次请求
+        self.cache_manager = cache_manager or CacheManager()
+        self.cache_hits = 0
+        self.cache_misses = 0
     
     def forward(
         self, 
@@ -130,19 +136,14 @@ class ContentRewriteTool:
             # 生成摘要
             summary = self.generate_summary(rewritten_content)
             
-            # 创建新的资讯项
-            rewritten_item = NewsItem(
+            # 复制资讯项并替换改写结果（保留原始分数）
+            rewritten_item = news_item.replace(
                 title=rewritten_title,
                 content=rewritten_content,
-                url=news_item.url,
-                source=news_item.source,
-                published_date=news_item.published_date,
-                tags=news_item.tags + ["rewritten"]
+                tags=news_item.tags + ["rewritten"],
+                summary=summary
             )
             
-            # 保留原始分数
-            rewritten_item.score = news_item.score
-            
             self.logger.info(f"资讯改写完成: {rewritten_title}")
             return rewritten_item
             
@@ -276,6 +277,14 @@ class ContentRewriteTool:
         Returns:
             str: API响应内容
         """
+        cache_key = self._get_cache_key(prompt, model, max_tokens, temperature)
+        cached_response = self.cache_manager.get(cache_key)
+        if cached_response is not None:
+            self.cache_hits += 1
+            return cached_response
+        
+        self.cache_misses += 1
+        
         # 速率限制
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
@@ -297,11 +306,32 @@ class ContentRewriteTool:
                 temperature=temperature
             )
             
-            return response.choices[0].message.content or ""
+            content = response.choices[0].message.content or ""
         
         except Exception as e:
             self.logger.error(f"OpenAI API调用失败: {e}")
             raise
+        
+        # 空响应不缓存，下次仍重新请求
+        if content:
+            self.cache_manager.set(cache_key, content)
+        return content
+    
+    def _get_cache_key(self, prompt: str, model: str, max_tokens: int, temperature: float) -> str:
+        """
+        生成API结果缓存键
+        
+        Args:
+            prompt: 提示词
+            model: 模型名称
+            max_tokens: 最大生成token数
+            temperature: 温度参数
+            
+        Returns:
+            str: 缓存键（提示词取摘要，避免日志中出现完整提示词）
+        """
+        prompt_digest = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+        return f"{self.__class__.__name__}_{model}_{max_tokens}_{temperature}_{prompt_digest}"
     
     def _parse_rewrite_response(self, response: str) -> str:
         """
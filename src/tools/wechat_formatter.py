@@ -14,6 +14,20 @@ from src.tools.base_tool import NewsItem
 from src.utils.logger import get_logger
 
 
+# 预编译的正则表达式，避免每篇文章重复解析
+_EXTRA_BLANK_LINES_PATTERN = re.compile(r'\n\s*\n\s*\n')
+_NUMBERED_LIST_PATTERN = re.compile(r'^\d+\.')
+_LIST_MARKER_PATTERN = re.compile(r'^[\d\-\*\•]+\.?\s*')
+
+# 标题emoji规则：(关键词, emoji名称)，按顺序匹配第一条
+_TITLE_EMOJI_RULES = (
+    (('ai', '人工智能', 'gpt'), 'ai'),
+    (('突破', 'breakthrough', '新'), 'breakthrough'),
+    (('研究', 'research', '论文'), 'research'),
+    (('github', '开源'), 'github'),
+)
+
+
 class WeChatFormatterTool:
     """微信公众号格式化工具"""
     
@@ -126,33 +140,30 @@ class WeChatFormatterTool:
         # 1. 清理和预处理内容
         cleaned_content = self._clean_content(content)
         
+        # 各部分依次收集，最后一次性拼接，避免正文较长时反复复制字符串
         # 2. 添加标题
-        formatted_content = self._format_title(title, add_emojis)
+        parts = [self._format_title(title, add_emojis)]
         
         # 3. 添加引言
-        intro = self._generate_intro(cleaned_content)
-        formatted_content += f"\n\n{intro}\n\n"
+        parts.append(self._generate_intro(cleaned_content))
         
         # 4. 格式化正文
-        formatted_body = self._format_body(cleaned_content, add_emojis)
-        formatted_content += formatted_body
+        parts.append(self._format_body(cleaned_content, add_emojis))
         
         # 5. 添加配图建议
         if include_images:
             image_suggestions = self._generate_image_suggestions(title, cleaned_content)
             if image_suggestions:
-                formatted_content += f"\n\n{image_suggestions}"
+                parts.append(image_suggestions)
         
         # 6. 添加来源信息
         if include_source_links:
-            source_info = self._format_source_info()
-            formatted_content += f"\n\n{source_info}"
+            parts.append(self._format_source_info())
         
         # 7. 添加结尾
-        ending = self._generate_ending(add_emojis)
-        formatted_content += f"\n\n{ending}"
+        parts.append(self._generate_ending(add_emojis))
         
-        return formatted_content
+        return '\n\n'.join(parts)
     
     def format_news_item(self, news_item: NewsItem) -> str:
         """
@@ -183,7 +194,7 @@ class WeChatFormatterTool:
             str: 清理后的内容
         """
         # 移除多余的空行
-        content = re.sub(r'\n\s*\n\s*\n', '\n\n', content)
+        content = _EXTRA_BLANK_LINES_PATTERN.sub('\n\n', content)
         
         # 移除行首行尾空格
         lines = [line.strip() for line in content.split('\n')]
@@ -209,16 +220,13 @@ class WeChatFormatterTool:
         
         if add_emojis:
             # 根据标题内容添加合适的emoji
-            if any(keyword in title.lower() for keyword in ['ai', '人工智能', 'gpt']):
-                formatted_title = f"# {self.emojis['ai']} {title}"
-            elif any(keyword in title.lower() for keyword in ['突破', 'breakthrough', '新']):
-                formatted_title = f"# {self.emojis['breakthrough']} {title}"
-            elif any(keyword in title.lower() for keyword in ['研究', 'research', '论文']):
-                formatted_title = f"# {self.emojis['research']} {title}"
-            elif any(keyword in title.lower() for keyword in ['github', '开源']):
-                formatted_title = f"# {self.emojis['github']} {title}"
-            else:
-                formatted_title = f"# {self.emojis['news']} {title}"
+            title_lower = title.lower()
+            emoji_name = next(
+                (name for keywords, name in _TITLE_EMOJI_RULES
+                 if any(keyword in title_lower for keyword in keywords)),
+                'news'
+            )
+            formatted_title = f"# {self.emojis[emoji_name]} {title}"
         
         return formatted_title
     
@@ -344,7 +352,7 @@ class WeChatFormatterTool:
         """
         return (
             text.strip().startswith(('1.', '2.', '3.', '4.', '5.', '-', '•', '*')) or
-            re.match(r'^\d+\.', text.strip())
+            _NUMBERED_LIST_PATTERN.match(text.strip())
         )
     
     def _format_list_item(self, item: str, add_emojis: bool = True) -> str:
@@ -361,7 +369,7 @@ class WeChatFormatterTool:
         if add_emojis:
             emoji = self.emojis.get('point', '👉')
             # 替换列表标记
-            item = re.sub(r'^[\d\-\*\•]+\.?\s*', f'{emoji} ', item.strip())
+            item = _LIST_MARKER_PATTERN.sub(f'{emoji} ', item.strip())
             return item
         else:
             return item
@@ -378,18 +386,19 @@ class WeChatFormatterTool:
             str: 配图建议
         """
         suggestions = []
+        content_lower = content.lower()
         
         # 根据内容类型生成建议
-        if 'github' in content.lower() or '开源' in content:
+        if 'github' in content_lower or '开源' in content:
             suggestions.append("GitHub项目截图或代码示例")
         
-        if 'arxiv' in content.lower() or '论文' in content:
+        if 'arxiv' in content_lower or '论文' in content:
             suggestions.append("论文首页截图或研究结果图表")
         
-        if 'huggingface' in content.lower() or '模型' in content:
+        if 'huggingface' in content_lower or '模型' in content:
             suggestions.append("模型架构图或性能对比图表")
         
-        if any(keyword in content.lower() for keyword in ['ai', '人工智能', 'gpt']):
+        if any(keyword in content_lower for keyword in ['ai', '人工智能', 'gpt']):
             suggestions.append("AI相关的概念图或技术示意图")
         
         if not suggestions:
@@ -0,0 +1,81 @@
+"""
+关键词提取模块
+基于预加载IDF表的TF-IDF关键词提取，结果按文本缓存
+
+Author: zengzhengtx
+"""
+
+import jieba
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from jieba.analyse.tfidf import DEFAULT_IDF, KeywordExtractor
+
+
+# 与jieba.analyse默认提取器保持一致的停用词
+_KEYWORD_STOPWORDS = frozenset(KeywordExtractor.STOP_WORDS)
+
+
+@lru_cache(maxsize=1)
+def _load_idf_table() -> Tuple[Dict[str, float], float]:
+    """
+    加载IDF表（进程内只读取一次）
+
+    Returns:
+        Tuple[Dict[str, float], float]: IDF字典和IDF中位数（未登录词默认值）
+    """
+    idf_table = {}
+    with open(DEFAULT_IDF, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.strip().split(' ')
+            if len(parts) == 2:
+                idf_table[parts[0]] = float(parts[1])
+
+    idf_values = sorted(idf_table.values())
+    median_idf = idf_values[len(idf_values) // 2] if idf_values else 0.0
+
+    return idf_table, median_idf
+
+
+@lru_cache(maxsize=1024)
+def _rank_keywords(text: str) -> Tuple[str, ...]:
+    """
+    按TF-IDF权重对文本中的全部候选词排序
+
+    Args:
+        text: 文本
+
+    Returns:
+        Tuple[str, ...]: 按权重降序排列的关键词
+    """
+    idf_table, median_idf = _load_idf_table()
+
+    term_freq = Counter(
+        word for word in jieba.cut(text)
+        if len(word.strip()) >= 2 and word.lower() not in _KEYWORD_STOPWORDS
+    )
+    if not term_freq:
+        return ()
+
+    # 归一化的词频对排序无影响，直接使用原始词频
+    weights = {word: freq * idf_table.get(word, median_idf) for word, freq in term_freq.items()}
+
+    return tuple(sorted(weights, key=weights.__getitem__, reverse=True))
+
+
+def extract_tags(text: str, top_k: int = 20) -> List[str]:
+    """
+    提取文本关键词，排序规则与jieba.analyse.extract_tags相同
+
+    Args:
+        text: 文本
+        top_k: 返回关键词数量
+
+    Returns:
+        List[str]: 关键词列表
+    """
+    if not text:
+        return []
+
+    return list(_rank_keywords(text)[:top_k])
@@ -8,8 +8,9 @@ Author: zengzhengtx
 import os
 import logging
 import sys
+import threading
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 from pathlib import Path
 
 
@@ -114,6 +115,9 @@ class LogCapture:
         self.max_lines = max_lines
         self.logs = []
         self.handler = None
+        # 已移出缓冲区的行数，使偏移量在截断和清空后仍保持单调递增
+        self._dropped = 0
+        self._lock = threading.Lock()
     
     def start_capture(self, logger_name: str = "wechat_agent"):
         """开始捕获日志"""
@@ -140,19 +144,39 @@ class LogCapture:
     
     def add_log(self, message: str):
         """添加日志消息"""
-        self.logs.append(f"{datetime.now().strftime('%H:%M:%S')} - {message}")
-        
-        # 保持最大行数限制
-        if len(self.logs) > self.max_lines:
-            self.logs = self.logs[-self.max_lines:]
+        with self._lock:
+            self.logs.append(f"{datetime.now().strftime('%H:%M:%S')} - {message}")
+            
+            # 保持最大行数限制
+            overflow = len(self.logs) - self.max_lines
+            if overflow > 0:
+                del self.logs[:overflow]
+                self._dropped += overflow
     
     def get_logs(self) -> str:
         """获取所有日志"""
-        return "\n".join(self.logs)
+        with self._lock:
+            return "\n".join(self.logs)
+    
+    def get_lines_since(self, offset: int) -> Tuple[List[str], int]:
+        """
+        按行获取指定偏移量之后的新日志
+        
+        Args:
+            offset: 上次调用返回的偏移量（首次传0）
+            
+        Returns:
+            Tuple[List[str], int]: 新增日志行和新的偏移量
+        """
+        with self._lock:
+            start = max(offset - self._dropped, 0)
+            return self.logs[start:], self._dropped + len(self.logs)
     
     def clear_logs(self):
         """清空日志"""
-        self.logs.clear()
+        with self._lock:
+            self._dropped += len(self.logs)
+            self.logs.clear()
 
 
 class LogCaptureHandler(logging.Handler):
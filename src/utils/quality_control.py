@@ -6,13 +6,78 @@ Author: zengzhengtx
 """
 
 import re
-import jieba
-import jieba.analyse
+import bisect
 from typing import Dict, Any, List, Optional
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
 
 from src.tools.base_tool import NewsItem
 from src.utils.logger import get_logger
+from src.utils.keywords import extract_tags
+
+
+# 长度评分分段表：<500, <800, <=3000, >3000
+_LENGTH_THRESHOLDS = (500, 800, 3001)
+_LENGTH_SCORES = (0.3, 0.6, 1.0, 0.7)
+_LENGTH_ISSUES = ("内容过短，可能信息不够完整", None, None, "内容过长，可能影响阅读体验")
+
+# 预编译的句子结束符和emoji匹配模式
+_SENTENCE_END_PATTERN = re.compile(r'[。！？]')
+_EMOJI_PATTERN = re.compile(
+    r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]'
+)
+
+# 问题关键字到改进建议的映射（按顺序匹配第一条）
+_ISSUE_SUGGESTIONS = (
+    ("内容过短", "增加更多相关信息，丰富内容"),
+    ("内容过长", "精简内容，保留核心信息"),
+    ("部分关键信息可能丢失", "确保保留原文的关键信息和术语"),
+    ("大量关键信息丢失", "重新改写，确保包含原文的主要信息点"),
+    ("原始来源URL丢失", "添加原始来源链接"),
+    ("缺少段落分隔", "增加段落分隔，提高可读性"),
+    ("句子过长", "将长句拆分为短句，提高可读性"),
+    ("缺少标题格式", "添加标题格式，使用'#'标记"),
+)
+
+
+@dataclass(frozen=True)
+class ContentMetrics:
+    """内容度量数据类，供各项检查共享"""
+    length: int
+    paragraph_count: int
+    avg_sentence_length: float
+    starts_with_title: bool
+    has_subheading: bool
+    has_bold: bool
+    has_emphasis: bool
+    has_emoji: bool
+
+
+def analyze_content(content: str) -> ContentMetrics:
+    """
+    一次性计算内容的各项度量
+    
+    Args:
+        content: 内容
+        
+    Returns:
+        ContentMetrics: 内容度量
+    """
+    # 句子长度统计：空白句计入句数但不计入字数，逐句遍历交给内置函数完成
+    sentences = _SENTENCE_END_PATTERN.split(content)
+    sentence_chars = sum(map(len, filter(str.strip, sentences)))
+    
+    return ContentMetrics(
+        length=len(content),
+        paragraph_count=content.count('\n\n') + 1,
+        avg_sentence_length=sentence_chars / len(sentences),
+        starts_with_title=content.startswith('#'),
+        has_subheading='##' in content,
+        has_bold='**' in content,
+        has_emphasis='*' in content,
+        has_emoji=_EMOJI_PATTERN.search(content) is not None
+    )
 
 
 class QualityController:
@@ -40,8 +105,11 @@ class QualityController:
             'suggestions': []
         }
         
+        # 内容度量只计算一次，供各项检查共享
+        metrics = analyze_content(rewritten.content)
+        
         # 1. 长度检查
-        length_check = self._check_length(rewritten.content)
+        length_check = self._check_length(metrics)
         result['score'] += length_check['score'] * 0.2
         if length_check['issues']:
             result['issues'].extend(length_check['issues'])
@@ -53,13 +121,13 @@ class QualityController:
             result['issues'].extend(completeness_check['issues'])
         
         # 3. 可读性检查
-        readability_check = self._check_readability(rewritten.content)
+        readability_check = self._check_readability(metrics)
         result['score'] += readability_check['score'] * 0.3
         if readability_check['issues']:
             result['issues'].extend(readability_check['issues'])
         
         # 4. 格式检查
-        format_check = self._check_format(rewritten.content)
+        format_check = self._check_format(metrics)
         result['score'] += format_check['score'] * 0.2
         if format_check['issues']:
             result['issues'].extend(format_check['issues'])
@@ -72,30 +140,22 @@ class QualityController:
         
         return result
     
-    def _check_length(self, content: str) -> Dict[str, Any]:
+    def _check_length(self, metrics: ContentMetrics) -> Dict[str, Any]:
         """
         检查内容长度
         
         Args:
-            content: 内容
+            metrics: 内容度量
             
         Returns:
             Dict[str, Any]: 检查结果
         """
         result = {'score': 0.0, 'issues': []}
         
-        length = len(content)
-        
-        if length < 500:
-            result['issues'].append("内容过短，可能信息不够完整")
-            result['score'] = 0.3
-        elif length < 800:
-            result['score'] = 0.6
-        elif length <= 3000:
-            result['score'] = 1.0
-        else:
-            result['issues'].append("内容过长，可能影响阅读体验")
-            result['score'] = 0.7
+        bucket = bisect.bisect_right(_LENGTH_THRESHOLDS, metrics.length)
+        result['score'] = _LENGTH_SCORES[bucket]
+        if _LENGTH_ISSUES[bucket]:
+            result['issues'].append(_LENGTH_ISSUES[bucket])
         
         return result
     
@@ -113,8 +173,8 @@ class QualityController:
         result = {'score': 0.0, 'issues': []}
         
         # 检查关键信息是否保留
-        original_keywords = set(jieba.analyse.extract_tags(original.content, topK=20))
-        rewritten_keywords = set(jieba.analyse.extract_tags(rewritten.content, topK=20))
+        original_keywords = set(extract_tags(original.content, top_k=20))
+        rewritten_keywords = set(extract_tags(rewritten.content, top_k=20))
         
         # 计算关键词保留率
         if original_keywords:
@@ -140,12 +200,12 @@ class QualityController:
         
         return result
     
-    def _check_readability(self, content: str) -> Dict[str, Any]:
+    def _check_readability(self, metrics: ContentMetrics) -> Dict[str, Any]:
         """
         检查可读性
         
         Args:
-            content: 内容
+            metrics: 内容度量
             
         Returns:
             Dict[str, Any]: 检查结果
@@ -153,33 +213,29 @@ class QualityController:
         result = {'score': 0.0, 'issues': []}
         
         # 检查段落结构
-        paragraphs = content.split('\n\n')
-        if len(paragraphs) < 2:
+        if metrics.paragraph_count < 2:
             result['issues'].append("缺少段落分隔，影响阅读体验")
             result['score'] = 0.5
         else:
             result['score'] = 0.8
         
         # 检查句子长度
-        sentences = re.split(r'[。！？]', content)
-        avg_sentence_length = sum(len(s) for s in sentences if s.strip()) / max(len(sentences), 1)
-        
-        if avg_sentence_length > 50:
+        if metrics.avg_sentence_length > 50:
             result['issues'].append("句子过长，建议适当分句")
             result['score'] *= 0.8
         
         # 检查是否有标题结构
-        if '##' in content or '**' in content:
+        if metrics.has_subheading or metrics.has_bold:
             result['score'] = min(result['score'] + 0.2, 1.0)
         
         return result
     
-    def _check_format(self, content: str) -> Dict[str, Any]:
+    def _check_format(self, metrics: ContentMetrics) -> Dict[str, Any]:
         """
         检查格式
         
         Args:
-            content: 内容
+            metrics: 内容度量
             
         Returns:
             Dict[str, Any]: 检查结果
@@ -189,22 +245,21 @@ class QualityController:
         score = 0.0
         
         # 检查是否有标题
-        if content.startswith('#'):
+        if metrics.starts_with_title:
             score += 0.3
         else:
             result['issues'].append("缺少标题格式")
         
         # 检查是否有emoji
-        emoji_pattern = r'[\U0001F600-\U0001F64F\U0001F300-\U0001F5FF\U0001F680-\U0001F6FF\U0001F1E0-\U0001F1FF]'
-        if re.search(emoji_pattern, content):
+        if metrics.has_emoji:
             score += 0.2
         
         # 检查是否有小标题
-        if '##' in content:
+        if metrics.has_subheading:
             score += 0.3
         
         # 检查是否有强调格式
-        if '**' in content or '*' in content:
+        if metrics.has_emphasis:
             score += 0.2
         
         result['score'] = min(score, 1.0)
@@ -223,19 +278,8 @@ class QualityController:
         """
         suggestions = []
         
-        issue_to_suggestion = {
-            "内容过短": "增加更多相关信息，丰富内容",
-            "内容过长": "精简内容，保留核心信息",
-            "部分关键信息可能丢失": "确保保留原文的关键信息和术语",
-            "大量关键信息丢失": "重新改写，确保包含原文的主要信息点",
-            "原始来源URL丢失": "添加原始来源链接",
-            "缺少段落分隔": "增加段落分隔，提高可读性",
-            "句子过长": "将长句拆分为短句，提高可读性",
-            "缺少标题格式": "添加标题格式，使用'#'标记"
-        }
-        
         for issue in issues:
-            for key, suggestion in issue_to_suggestion.items():
+            for key, suggestion in _ISSUE_SUGGESTIONS:
                 if key in issue:
                     suggestions.append(suggestion)
                     break
@@ -281,28 +325,20 @@ class QualityController:
         Returns:
             Dict[str, Any]: 统计信息
         """
-        stats = {
-            'total': len(results),
-            'valid': sum(1 for r in results if r['is_valid']),
-            'invalid': sum(1 for r in results if not r['is_valid']),
-            'avg_score': sum(r['score'] for r in results) / max(len(results), 1),
-            'common_issues': {}
-        }
-        
-        # 统计常见问题
-        all_issues = []
+        # 一次遍历同时累计通过数、总分和问题频次
+        valid_count = 0
+        total_score = 0.0
+        issue_counts = Counter()
         for result in results:
-            all_issues.extend(result['issues'])
-        
-        for issue in all_issues:
-            if issue in stats['common_issues']:
-                stats['common_issues'][issue] += 1
-            else:
-                stats['common_issues'][issue] = 1
+            valid_count += bool(result['is_valid'])
+            total_score += result['score']
+            issue_counts.update(result['issues'])
         
-        # 按出现频率排序
-        stats['common_issues'] = dict(
-            sorted(stats['common_issues'].items(), key=lambda x: x[1], reverse=True)
-        )
-        
-        return stats
+        return {
+            'total': len(results),
+            'valid': valid_count,
+            'invalid': len(results) - valid_count,
+            'avg_score': total_score / max(len(results), 1),
+            # 按出现频率排序（频次相同时保持首次出现顺序）
+            'common_issues': dict(issue_counts.most_common())
+        }
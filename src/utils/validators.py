@@ -6,18 +6,201 @@ Author: zengzhengtx
 """
 
 import re
+import bisect
 import jieba
-import jieba.analyse
-from typing import List, Dict, Any, Set, Tuple
-from collections import Counter
+from typing import List, Dict, Any, Set, FrozenSet, Tuple, NamedTuple, Optional, Iterable
+from collections import Counter, defaultdict
+from collections.abc import Sized
+from functools import lru_cache
+from operator import attrgetter
 from datetime import datetime, timedelta
 import textstat
 
 from src.tools.base_tool import NewsItem
 from src.utils.logger import get_logger
+from src.utils.keywords import extract_tags
 from src.utils.datetime_utils import normalize_datetime, safe_datetime_subtract, get_utc_now, days_since
 
 
+# 停用词表（中英文），模块加载时构建一次
+_STOPWORDS: FrozenSet[str] = frozenset({
+    # 常见中文停用词
+    '的', '了', '和', '是', '就', '都', '而', '及', '与', '这', '那', '有', '在',
+    '中', '为', '对', '到', '以', '等', '上', '下', '由', '于', '从', '之', '或',
+    '也', '如', '但', '并', '很', '再', '已', '所', '然', '没', '去', '能', '好',
+    '还', '只', '会', '多', '于是', '吧', '呢', '啊', '哦', '嗯', '这样', '那样',
+    # 常见英文停用词
+    'the', 'a', 'an', 'and', 'or', 'but', 'if', 'because', 'as', 'what',
+    'which', 'this', 'that', 'these', 'those', 'then', 'just', 'so', 'than',
+    'such', 'both', 'through', 'about', 'for', 'is', 'of', 'while', 'during',
+    'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'once',
+    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'each'
+})
+
+# 内容长度评分分段表：<100, <300, <1000, >=1000
+_CONTENT_LENGTH_THRESHOLDS = (100, 300, 1000)
+_CONTENT_LENGTH_SCORES = (0.2, 0.5, 0.8, 1.0)
+
+# 时效性评分分段表（天）：24小时内、3天内、1周内、2周内、1个月内、3个月内、更早
+_RECENCY_THRESHOLDS = (1, 3, 7, 14, 30, 90)
+_RECENCY_SCORES = (1.0, 0.9, 0.8, 0.6, 0.4, 0.2, 0.1)
+
+# 长文本相似度改用字符shingle哈希，短文本（如标题）仍走分词路径
+_SHINGLE_SIZE = 4
+_SHINGLE_MIN_LENGTH = 100
+
+# 标题质量评估：AI相关关键词与格式化标题的冒号
+_AI_TITLE_KEYWORDS = ('AI', '人工智能', '机器学习', '深度学习', 'GPT', '大模型', 'LLM')
+_TITLE_COLON_PATTERN = re.compile(r'[:：]')
+
+# 内容丰富度评估：URL与百分比数据
+_URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_PERCENTAGE_PATTERN = re.compile(r'\d+(?:\.\d+)?%')
+
+# 来源可靠性评分表（按前缀顺序匹配）
+_SOURCE_RELIABILITY_SCORES = (
+    ('arxiv', 0.9),
+    ('github', 0.8),
+    ('huggingface', 0.9),
+    ('web_search', 0.6),
+)
+_DEFAULT_SOURCE_RELIABILITY = 0.5
+
+# 相关性排序键：分数优先，其次发布时间
+_RELEVANCE_SORT_KEY = attrgetter('score', 'published_date')
+
+# 去重综合相似度中标题与内容关键词的权重
+_TITLE_WEIGHT = 0.6
+_KEYWORD_WEIGHT = 0.4
+
+
+def _shingle_hashes(text: str, size: int = _SHINGLE_SIZE) -> Set[int]:
+    """
+    计算文本的字符shingle哈希集合
+
+    Args:
+        text: 文本
+        size: shingle长度
+
+    Returns:
+        Set[int]: 64位shingle哈希集合
+    """
+    if len(text) <= size:
+        return {hash(text)}
+    return {hash(text[i:i + size]) for i in range(len(text) - size + 1)}
+
+
+@lru_cache(maxsize=256)
+def _source_reliability(source: str) -> float:
+    """
+    按来源前缀查找可靠性分数，来源种类很少，结果按来源缓存
+
+    Args:
+        source: 来源标识
+
+    Returns:
+        float: 可靠性分数 (0-1)
+    """
+    for prefix, score in _SOURCE_RELIABILITY_SCORES:
+        if source.startswith(prefix):
+            return score
+    return _DEFAULT_SOURCE_RELIABILITY
+
+
+def _jaccard(set1: Set, set2: Set) -> float:
+    """
+    计算两个集合的Jaccard相似度，任一为空时返回0
+
+    Args:
+        set1: 集合1
+        set2: 集合2
+
+    Returns:
+        float: 相似度分数 (0-1)
+    """
+    if not set1 or not set2:
+        return 0.0
+    return len(set1 & set2) / len(set1 | set2)
+
+
+def _mask_jaccard(mask1: int, mask2: int) -> float:
+    """
+    计算两个整数位图表示的集合的Jaccard相似度，任一为空时返回0
+
+    Args:
+        mask1: 位图1
+        mask2: 位图2
+
+    Returns:
+        float: 相似度分数 (0-1)
+    """
+    if not mask1 or not mask2:
+        return 0.0
+    return (mask1 & mask2).bit_count() / (mask1 | mask2).bit_count()
+
+
+def _encode_mask(words, vocab: Dict[str, int]) -> int:
+    """
+    按批次词表把词集合编码为整数位图
+
+    Args:
+        words: 词集合
+        vocab: 词到比特位的映射（会被扩充）
+
+    Returns:
+        int: 整数位图
+    """
+    mask = 0
+    for word in words:
+        mask |= 1 << vocab.setdefault(word, len(vocab))
+    return mask
+
+
+def _iter_bits(mask: int):
+    """
+    依次产出整数位图中置位的比特位序号
+
+    Args:
+        mask: 整数位图
+
+    Yields:
+        int: 比特位序号
+    """
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class _Fingerprint(NamedTuple):
+    """去重用内容指纹，标题分词结果预先计算并编码为位图，避免在两两比较时重复分词"""
+    title: str
+    title_mask: int
+    title_shingles: Optional[Set[int]]  # 标题足够长时才计算
+    keyword_mask: int
+
+
+def _title_index_keys(fingerprint: _Fingerprint):
+    """
+    产出指纹在标题倒排索引中的键
+
+    标题相似度大于0时两者必然标题相同、共享标题词或（均有shingle时）共享shingle，
+    三类键加前缀区分，保证候选集合是所有标题相似度大于0的指纹的超集
+
+    Args:
+        fingerprint: 内容指纹
+
+    Yields:
+        Tuple[str, Any]: 索引键
+    """
+    yield ('t', fingerprint.title)
+    for bit in _iter_bits(fingerprint.title_mask):
+        yield ('w', bit)
+    if fingerprint.title_shingles is not None:
+        for shingle in fingerprint.title_shingles:
+            yield ('s', shingle)
+
+
 class ContentFilter:
     """内容筛选器"""
     
@@ -26,26 +209,28 @@ class ContentFilter:
         self.min_quality_score = min_quality_score
         self.logger = get_logger()
         
-        # 加载停用词
-        self.stopwords = self._load_stopwords()
+        # 停用词（模块级共享）
+        self.stopwords = _STOPWORDS
         
         # 初始化jieba
         jieba.initialize()
     
-    def filter_and_dedupe(self, news_items: List[NewsItem]) -> List[NewsItem]:
+    def filter_and_dedupe(self, news_items: Iterable[NewsItem]) -> List[NewsItem]:
         """
         过滤和去重处理
         
         Args:
-            news_items: 资讯项列表
+            news_items: 资讯项列表，也可以是生成器（质量未达标的资讯项不会被保留）
             
         Returns:
             List[NewsItem]: 处理后的资讯项列表
         """
-        if not news_items:
-            return []
-        
-        self.logger.info(f"开始内容筛选和去重，原始数量: {len(news_items)}")
+        if isinstance(news_items, Sized):
+            if not news_items:
+                return []
+            self.logger.info(f"开始内容筛选和去重，原始数量: {len(news_items)}")
+        else:
+            self.logger.info("开始内容筛选和去重（流式输入）")
         
         # 1. 质量评估
         quality_items = self.filter_by_quality(news_items)
@@ -60,24 +245,24 @@ class ContentFilter:
         
         return sorted_items
     
-    def filter_by_quality(self, news_items: List[NewsItem]) -> List[NewsItem]:
+    def filter_by_quality(self, news_items: Iterable[NewsItem]) -> List[NewsItem]:
         """
         按质量筛选
         
         Args:
-            news_items: 资讯项列表
+            news_items: 资讯项列表或可迭代对象
             
         Returns:
             List[NewsItem]: 高质量资讯项列表
         """
-        quality_items = []
+        # 质量评分是不修改资讯项的纯映射，边迭代边评分，未达标的资讯项不会被保留
+        scored_items = ((item, self.assess_quality(item)) for item in news_items)
         
-        for item in news_items:
-            # 计算质量分数
-            quality_score = self.assess_quality(item)
-            item.score = max(item.score, quality_score)  # 取较高的分数
-            
+        # 只为保留的资讯项更新分数
+        quality_items = []
+        for item, quality_score in scored_items:
             if quality_score >= self.min_quality_score:
+                item.score = max(item.score, quality_score)  # 取较高的分数
                 quality_items.append(item)
         
         return quality_items
@@ -97,20 +282,59 @@ class ContentFilter:
         
         unique_items = []
         seen_fingerprints = []
+        # 本批次关键词/标题词到比特位的映射，词集合编码为整数位图
+        keyword_vocab: Dict[str, int] = {}
+        title_vocab: Dict[str, int] = {}
+        # 关键词倒排索引：比特位 -> 已保留指纹的下标
+        keyword_postings: Dict[int, List[int]] = defaultdict(list)
+        # 标题倒排索引：标题/标题词/标题shingle -> 已保留指纹的下标
+        title_postings: Dict[Tuple[str, Any], List[int]] = defaultdict(list)
 
-        for item in news_items:
+        # 阈值高于标题权重时，重复项必然至少共享一个内容关键词；
+        # 阈值高于关键词权重时，重复项的标题相似度必然大于0。
+        # 两个必要条件各自分桶，只与两路候选的交集比较；都不满足时退回全量比较
+        use_keyword_postings = self.duplicate_threshold > _TITLE_WEIGHT
+        use_title_postings = self.duplicate_threshold > _KEYWORD_WEIGHT
+
+        # 分词与关键词提取与批次无关，先整体计算
+        item_tokens = self._tokenize_items(news_items)
+
+        for item, (title_words, content_keywords) in zip(news_items, item_tokens):
             # 计算内容指纹
-            fingerprint = self._calculate_fingerprint(item)
+            fingerprint = self._calculate_fingerprint(
+                item, title_words, content_keywords, keyword_vocab, title_vocab
+            )
+
+            candidates = None
+            if use_keyword_postings:
+                candidates = {
+                    index
+                    for bit in _iter_bits(fingerprint.keyword_mask)
+                    for index in keyword_postings.get(bit, ())
+                }
+            if use_title_postings and (candidates is None or candidates):
+                title_candidates = {
+                    index
+                    for key in _title_index_keys(fingerprint)
+                    for index in title_postings.get(key, ())
+                }
+                candidates = title_candidates if candidates is None else candidates & title_candidates
+            if candidates is None:
+                candidates = range(len(seen_fingerprints))
 
             # 检查是否重复
-            is_duplicate = False
-            for seen_fp in seen_fingerprints:
-                similarity = self._calculate_fingerprint_similarity(fingerprint, seen_fp)
-                if similarity >= self.duplicate_threshold:
-                    is_duplicate = True
-                    break
+            is_duplicate = any(
+                self._calculate_fingerprint_similarity(fingerprint, seen_fingerprints[index])
+                >= self.duplicate_threshold
+                for index in candidates
+            )
 
             if not is_duplicate:
+                index = len(seen_fingerprints)
+                for bit in _iter_bits(fingerprint.keyword_mask):
+                    keyword_postings[bit].append(index)
+                for key in _title_index_keys(fingerprint):
+                    title_postings[key].append(index)
                 unique_items.append(item)
                 seen_fingerprints.append(fingerprint)
         
@@ -126,12 +350,8 @@ class ContentFilter:
         Returns:
             List[NewsItem]: 排序后的资讯项列表
         """
-        # 按分数和发布时间排序
-        sorted_items = sorted(
-            news_items,
-            key=lambda x: (x.score, x.published_date),
-            reverse=True
-        )
+        # 按分数和发布时间排序（attrgetter在C层取键，避免每项一次lambda调用）
+        sorted_items = sorted(news_items, key=_RELEVANCE_SORT_KEY, reverse=True)
         
         return sorted_items
     
@@ -148,15 +368,9 @@ class ContentFilter:
         score = 0.0
         
         # 1. 内容长度评估 (20%)
-        content_length = len(news_item.content)
-        if content_length < 100:
-            length_score = 0.2
-        elif content_length < 300:
-            length_score = 0.5
-        elif content_length < 1000:
-            length_score = 0.8
-        else:
-            length_score = 1.0
+        length_score = _CONTENT_LENGTH_SCORES[
+            bisect.bisect_right(_CONTENT_LENGTH_THRESHOLDS, len(news_item.content))
+        ]
         
         score += length_score * 0.2
         
@@ -203,14 +417,11 @@ class ContentFilter:
             score += 0.1
         
         # 标题关键词
-        ai_keywords = ['AI', '人工智能', '机器学习', '深度学习', 'GPT', '大模型', 'LLM']
-        for keyword in ai_keywords:
-            if keyword in title:
-                score += 0.3
-                break
+        if any(keyword in title for keyword in _AI_TITLE_KEYWORDS):
+            score += 0.3
         
         # 标题格式
-        if re.search(r'[:：]', title):  # 包含冒号，可能是格式化的标题
+        if _TITLE_COLON_PATTERN.search(title):  # 包含冒号，可能是格式化的标题
             score += 0.2
         
         return min(score, 1.0)
@@ -231,7 +442,7 @@ class ContentFilter:
         score = 0.0
         
         # 1. 关键词密度
-        keywords = jieba.analyse.extract_tags(content, topK=10)
+        keywords = extract_tags(content, top_k=10)
         if len(keywords) >= 5:
             score += 0.3
         elif len(keywords) >= 3:
@@ -260,10 +471,10 @@ class ContentFilter:
             score += 0.1
         
         # 4. 特殊内容
-        if re.search(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', content):
+        if _URL_PATTERN.search(content):
             score += 0.1  # 包含URL
         
-        if re.search(r'\d+(?:\.\d+)?%', content):
+        if _PERCENTAGE_PATTERN.search(content):
             score += 0.1  # 包含百分比数据
         
         return min(score, 1.0)
@@ -285,20 +496,7 @@ class ContentFilter:
         if days_diff is None:
             return 0.5  # 如果无法计算，返回默认值
 
-        if days_diff < 1:
-            return 1.0  # 24小时内
-        elif days_diff < 3:
-            return 0.9  # 3天内
-        elif days_diff < 7:
-            return 0.8  # 1周内
-        elif days_diff < 14:
-            return 0.6  # 2周内
-        elif days_diff < 30:
-            return 0.4  # 1个月内
-        elif days_diff < 90:
-            return 0.2  # 3个月内
-        else:
-            return 0.1  # 更早
+        return _RECENCY_SCORES[bisect.bisect_right(_RECENCY_THRESHOLDS, days_diff)]
     
     def _assess_source_reliability(self, source: str) -> float:
         """
@@ -310,47 +508,69 @@ class ContentFilter:
         Returns:
             float: 可靠性分数 (0-1)
         """
-        # 预定义的可靠来源评分
-        source_scores = {
-            'arxiv': 0.9,
-            'github': 0.8,
-            'huggingface': 0.9,
-            'web_search': 0.6,
-        }
-        
-        # 检查来源前缀
-        for prefix, score in source_scores.items():
-            if source.startswith(prefix):
-                return score
-        
-        return 0.5  # 默认中等可靠性
+        # 预定义的可靠来源评分（按来源缓存）
+        return _source_reliability(source)
     
-    def _calculate_fingerprint(self, news_item: NewsItem) -> str:
+    def _tokenize_items(self, news_items: List[NewsItem]) -> List[Tuple[Set[str], List[str]]]:
         """
-        计算内容指纹
+        批量计算资讯项的标题词集合和内容关键词
+
+        标题和内容完全相同的资讯项（多源转载、重复抓取）只计算一次。
+        内容关键词的分词结果已在质量评估阶段进入extract_tags的缓存，这里主要是标题分词
 
         Args:
-            news_item: 资讯项
+            news_items: 资讯项列表
 
         Returns:
-            str: 内容指纹字符串
+            List[Tuple[Set[str], List[str]]]: 与资讯项一一对应的标题词集合和内容关键词
         """
-        # 提取标题关键词
-        title_keywords = jieba.analyse.extract_tags(news_item.title, topK=10)
+        # 按(标题, 内容)精确分块，相同文本共享一次分词结果
+        text_indices: Dict[Tuple[str, str], int] = {}
+        item_indices = [
+            text_indices.setdefault((item.title, item.content), len(text_indices))
+            for item in news_items
+        ]
+        text_tokens = [
+            (self._tokenize(title), extract_tags(content, top_k=30))
+            for title, content in text_indices
+        ]
 
-        # 提取内容关键词
-        content_keywords = jieba.analyse.extract_tags(news_item.content, topK=30)
+        return [text_tokens[index] for index in item_indices]
+    
+    def _calculate_fingerprint(
+        self,
+        news_item: NewsItem,
+        title_words: Set[str],
+        content_keywords: List[str],
+        keyword_vocab: Dict[str, int],
+        title_vocab: Dict[str, int]
+    ) -> _Fingerprint:
+        """
+        计算内容指纹
 
-        # 创建指纹字符串
-        fingerprint = f"{news_item.title}|{','.join(sorted(title_keywords))}|{','.join(sorted(content_keywords))}"
+        标题与内容高度重合，只对内容提取关键词；标题的分词/shingle结果随指纹一起缓存。
+        关键词和标题词集合按批次词表编码为整数位图，交并集计算可直接使用位运算和popcount
+
+        Args:
+            news_item: 资讯项
+            title_words: 标题词集合
+            content_keywords: 内容关键词列表
+            keyword_vocab: 关键词到比特位的映射（会被扩充）
+            title_vocab: 标题词到比特位的映射（会被扩充）
+
+        Returns:
+            _Fingerprint: 内容指纹
+        """
+        title = news_item.title
 
-        return fingerprint
+        return _Fingerprint(
+            title=title,
+            title_mask=_encode_mask(title_words, title_vocab),
+            title_shingles=_shingle_hashes(title) if len(title) >= _SHINGLE_MIN_LENGTH else None,
+            keyword_mask=_encode_mask(content_keywords, keyword_vocab)
+        )
     
-    def _calculate_fingerprint_similarity(
-        self,
-        fp1: str,
-        fp2: str
-    ) -> float:
+    def _calculate_fingerprint_similarity(self, fp1: _Fingerprint, fp2: _Fingerprint) -> float:
         """
         计算指纹相似度
 
@@ -361,96 +581,28 @@ class ContentFilter:
         Returns:
             float: 相似度分数 (0-1)
         """
-        # 分解指纹
-        parts1 = fp1.split('|')
-        parts2 = fp2.split('|')
-
-        if len(parts1) != 3 or len(parts2) != 3:
-            return 0.0
-
-        title1, title_kw1, content_kw1 = parts1
-        title2, title_kw2, content_kw2 = parts2
-
-        # 标题相似度
-        title_similarity = self._calculate_text_similarity(title1, title2)
-
-        # 标题关键词相似度
-        title_kw_set1 = set(title_kw1.split(',')) if title_kw1 else set()
-        title_kw_set2 = set(title_kw2.split(',')) if title_kw2 else set()
-
-        # 内容关键词相似度
-        content_kw_set1 = set(content_kw1.split(',')) if content_kw1 else set()
-        content_kw_set2 = set(content_kw2.split(',')) if content_kw2 else set()
-
-        # 计算关键词相似度
-        kw_similarity = 0.0
-        if title_kw_set1 and title_kw_set2:
-            intersection = title_kw_set1.intersection(title_kw_set2)
-            union = title_kw_set1.union(title_kw_set2)
-            kw_similarity += len(intersection) / len(union) * 0.4
+        # 标题相似度：完全相同为1；两个标题都较长时比较shingle哈希集合，否则比较标题词位图
+        if fp1.title == fp2.title:
+            title_similarity = 1.0
+        elif fp1.title_shingles is not None and fp2.title_shingles is not None:
+            title_similarity = _jaccard(fp1.title_shingles, fp2.title_shingles)
+        else:
+            title_similarity = _mask_jaccard(fp1.title_mask, fp2.title_mask)
 
-        if content_kw_set1 and content_kw_set2:
-            intersection = content_kw_set1.intersection(content_kw_set2)
-            union = content_kw_set1.union(content_kw_set2)
-            kw_similarity += len(intersection) / len(union) * 0.6
+        # 内容关键词相似度（位图Jaccard）
+        kw_similarity = _mask_jaccard(fp1.keyword_mask, fp2.keyword_mask)
 
         # 综合相似度 (标题权重更高)
-        return title_similarity * 0.6 + kw_similarity * 0.4
+        return title_similarity * _TITLE_WEIGHT + kw_similarity * _KEYWORD_WEIGHT
     
-    def _calculate_text_similarity(self, text1: str, text2: str) -> float:
+    def _tokenize(self, text: str) -> Set[str]:
         """
-        计算文本相似度
+        分词并移除停用词
         
         Args:
-            text1: 文本1
-            text2: 文本2
+            text: 文本
             
         Returns:
-            float: 相似度分数 (0-1)
-        """
-        if text1 == text2:
-            return 1.0
-        
-        # 分词
-        words1 = set(jieba.cut(text1))
-        words2 = set(jieba.cut(text2))
-        
-        # 移除停用词
-        words1 = words1 - self.stopwords
-        words2 = words2 - self.stopwords
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        # 计算Jaccard相似度
-        intersection = words1.intersection(words2)
-        union = words1.union(words2)
-        
-        return len(intersection) / len(union)
-    
-    def _load_stopwords(self) -> Set[str]:
-        """
-        加载停用词
-        
-        Returns:
-            Set[str]: 停用词集合
+            Set[str]: 词集合
         """
-        # 常见中文停用词
-        stopwords = {
-            '的', '了', '和', '是', '就', '都', '而', '及', '与', '这', '那', '有', '在',
-            '中', '为', '对', '到', '以', '等', '上', '下', '由', '于', '从', '之', '或',
-            '也', '如', '但', '并', '很', '再', '已', '所', '然', '没', '去', '能', '好',
-            '还', '只', '会', '多', '于是', '吧', '呢', '啊', '哦', '嗯', '这样', '那样'
-        }
-        
-        # 常见英文停用词
-        english_stopwords = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'if', 'because', 'as', 'what',
-            'which', 'this', 'that', 'these', 'those', 'then', 'just', 'so', 'than',
-            'such', 'both', 'through', 'about', 'for', 'is', 'of', 'while', 'during',
-            'to', 'from', 'in', 'out', 'on', 'off', 'over', 'under', 'again', 'once',
-            'here', 'there', 'when', 'where', 'why', 'how', 'all', 'any', 'both', 'each'
-        }
-        
-        stopwords.update(english_stopwords)
-        return stopwords
+        return set(jieba.cut(text)) - self.stopwords
@@ -8,7 +8,11 @@ Author: zengzhengtx
 import os
 import gradio as gr
 import time
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+from collections import deque
+from pathlib import Path
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterator
 from datetime import datetime
 
 from src.agent.config import load_config, AppConfig
@@ -18,9 +22,46 @@ from src.database.models import Article
 from src.utils.logger import get_logger, log_capture
 
 
+# 运行信息中文章统计的缓存时长（秒），合并短时间内的重复刷新
+STATS_CACHE_TTL = 2.0
+
+# 文章导出目录
+EXPORT_DIR = "output/exports"
+
+# 后台运行智能体时刷新日志的间隔（秒）
+LOG_POLL_INTERVAL = 0.5
+
+
+def _format_minute(timestamp: str) -> str:
+    """
+    将数据库中的ISO时间字符串格式化为"YYYY-MM-DD HH:MM"
+    
+    直接截取字符串，避免逐行解析datetime再调用strftime
+    
+    Args:
+        timestamp: ISO格式时间字符串（日期与时间之间为'T'或空格）
+        
+    Returns:
+        str: 格式化后的时间
+    """
+    return f"{timestamp[:10]} {timestamp[11:16]}"
+
+
 class WebInterface:
     """Web界面类"""
     
+    # 状态过滤选项到数据库状态值的映射
+    _STATUS_MAP = {
+        "全部": None,
+        "草稿": "draft",
+        "已发布": "published",
+        "已归档": "archived"
+    }
+    
+    # 来源分布的无数据/出错占位数据（返回浅拷贝）
+    _EMPTY_SOURCE_DISTRIBUTION = {"来源": ["暂无数据"], "数量": [0]}
+    _ERROR_SOURCE_DISTRIBUTION = {"来源": ["错误"], "数量": [0]}
+    
     def __init__(self, config_path: str = "config.yaml"):
         self.config = load_config(config_path)
         self.logger = get_logger()
@@ -28,12 +69,30 @@ class WebInterface:
         # 初始化数据库
         self.db_manager = DatabaseManager(self.config.database_path)
         
-        # 初始化智能体
-        self.agent = AINewsAgent(config_path)
+        # 创建导出目录
+        self._export_dir = Path(EXPORT_DIR)
+        self._export_dir.mkdir(parents=True, exist_ok=True)
+        
+        # 初始化智能体（共享已加载的配置和数据库管理器）
+        self.agent = AINewsAgent(config_path, config=self.config, db_manager=self.db_manager)
         
         # 运行状态
         self.is_running = False
         self.start_time = None
+        self._start_time_text = "无"  # 开始时间的显示文本，启动时格式化一次
+        
+        # 智能体在后台线程中运行，停止信号由智能体在各资讯源之间检查
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="agent")
+        self._stop_event = threading.Event()
+        
+        # 统计面板的两个独立查询并行执行（不占用智能体线程）
+        self._stats_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="stats")
+        
+        # 文章统计缓存: (获取时间, 统计数据)
+        self._stats_cache: Optional[Tuple[float, Dict[str, int]]] = None
+        
+        # 按ID缓存的已加载文章（文章列表由各会话的表格自身保存，不在实例上共享）
+        self._articles_cache: Dict[int, Article] = {}
         
         self.logger.info("Web界面初始化完成")
     
@@ -63,6 +122,9 @@ class WebInterface:
             # 页面加载时自动刷新文章列表
             app.load(self._refresh_article_list)
         
+        # 启用队列以支持流式输出运行日志
+        app.queue()
+        
         return app
     
     def _create_control_panel(self):
@@ -152,6 +214,7 @@ class WebInterface:
                     headers=["ID", "标题", "状态", "来源", "创建时间", "质量分数"],
                     datatype=["number", "str", "str", "str", "str", "number"],
                     label="文章列表",
+                    type="array",
                     interactive=False,
                     wrap=True
                 )
@@ -194,8 +257,10 @@ class WebInterface:
             outputs=[self.article_list]
         )
         
+        # 选择和保存时读取当前会话表格中的数据，行号与文章ID的对应关系不跨会话共享
         self.article_list.select(
             fn=self._select_article,
+            inputs=[self.article_list],
             outputs=[self.article_id_input, self.article_title, self.article_content]
         )
         
@@ -207,7 +272,7 @@ class WebInterface:
         
         self.save_article_btn.click(
             fn=self._save_article_changes,
-            inputs=[self.article_id_input, self.article_title, self.article_content],
+            inputs=[self.article_id_input, self.article_title, self.article_content, self.article_list],
             outputs=[self.article_list]
         )
         
@@ -336,36 +401,25 @@ class WebInterface:
             outputs=[self.article_stats, self.source_chart]
         )
     
-    def _start_agent(self) -> Tuple[str, str, Dict[str, Any]]:
+    def _start_agent(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
         """
         启动智能体
         
-        Returns:
+        Yields:
             Tuple[str, str, Dict[str, Any]]: 状态文本、日志输出、运行信息
         """
         if self.is_running:
-            return "智能体已在运行中", log_capture.get_logs(), self._get_run_info()
-        
-        self.is_running = True
-        self.start_time = datetime.now()
+            yield "智能体已在运行中", log_capture.get_logs(), self._get_run_info()
+            return
         
         self.logger.info("启动智能体...")
         
-        try:
-            # 清空日志
-            log_capture.clear_logs()
-            
-            # 启动智能体
-            self.agent.run_news_collection()
-            
-            self.is_running = False
-            
-            return "运行完成", log_capture.get_logs(), self._get_run_info()
-            
-        except Exception as e:
-            self.logger.error(f"智能体运行失败: {e}")
-            self.is_running = False
-            return f"运行失败: {str(e)}", log_capture.get_logs(), self._get_run_info()
+        yield from self._run_in_background(
+            lambda: self.agent.run_news_collection(self._stop_event),
+            success_status="运行完成",
+            failure_label="智能体运行失败",
+            failure_status="运行失败"
+        )
     
     def _stop_agent(self) -> Tuple[str, str, Dict[str, Any]]:
         """
@@ -378,9 +432,82 @@ class WebInterface:
             return "智能体未在运行", log_capture.get_logs(), self._get_run_info()
         
         self.logger.info("停止智能体...")
-        self.is_running = False
+        self._stop_event.set()
+        
+        return "正在停止...", log_capture.get_logs(), self._get_run_info()
+    
+    def _run_in_background(
+        self,
+        task: Callable[[], Any],
+        success_status: str,
+        failure_label: str,
+        failure_status: str
+    ) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        在后台线程中执行智能体任务，并持续输出运行日志
+        
+        Args:
+            task: 要执行的任务
+            success_status: 成功时的状态文本
+            failure_label: 失败时的日志前缀
+            failure_status: 失败时的状态文本前缀
+            
+        Yields:
+            Tuple[str, str, Dict[str, Any]]: 状态文本、日志输出、运行信息
+        """
+        self.is_running = True
+        self.start_time = datetime.now()
+        self._start_time_text = self.start_time.strftime("%Y-%m-%d %H:%M:%S")
+        self._stop_event.clear()
+        
+        # 清空日志
+        log_capture.clear_logs()
+        
+        future = self._executor.submit(task)
+        # 运行状态随任务结束复位；界面连接断开或事件取消时生成器会在yield处被关闭，
+        # 不能依赖下方轮询循环正常结束
+        future.add_done_callback(self._on_task_done)
+        
+        # 按偏移量增量读取日志，只保留最近max_lines行；没有新日志时不更新日志框
+        log_lines: deque = deque(maxlen=log_capture.max_lines)
+        log_offset = 0
+        
+        # 用wait轮询任务是否结束，不借助result()超时判断：任务自身抛出的TimeoutError
+        # 与concurrent.futures.TimeoutError是同一个类，会被误当作仍在运行
+        while not wait([future], timeout=LOG_POLL_INTERVAL).done:
+            new_lines, log_offset = log_capture.get_lines_since(log_offset)
+            if new_lines:
+                log_lines.extend(new_lines)
+                log_output = "\n".join(log_lines)
+            else:
+                log_output = gr.update()
+            yield "运行中...", log_output, self._get_run_info()
+        
+        try:
+            future.result()
+        except Exception as e:
+            self.logger.error(f"{failure_label}: {e}")
+            status = f"{failure_status}: {str(e)}"
+        else:
+            status = "已停止" if self._stop_event.is_set() else success_status
+        
+        # 任务已结束，回调可能尚未执行，先行复位以便下方运行信息显示为就绪
+        self._on_task_done(future)
         
-        return "已停止", log_capture.get_logs(), self._get_run_info()
+        new_lines, log_offset = log_capture.get_lines_since(log_offset)
+        log_lines.extend(new_lines)
+        
+        yield status, "\n".join(log_lines), self._get_run_info()
+    
+    def _on_task_done(self, future: Future) -> None:
+        """
+        后台任务结束时复位运行状态
+        
+        Args:
+            future: 已结束的任务
+        """
+        self.is_running = False
+        self._invalidate_stats_cache()
     
     def _clear_logs(self) -> str:
         """
@@ -399,53 +526,72 @@ class WebInterface:
         Returns:
             Dict[str, Any]: 运行信息
         """
+        stats = self._get_cached_stats()
+        
         info = {
             "状态": "运行中" if self.is_running else "就绪",
-            "开始时间": self.start_time.strftime("%Y-%m-%d %H:%M:%S") if self.start_time else "无",
+            "开始时间": self._start_time_text,
             "运行时长": str(datetime.now() - self.start_time).split('.')[0] if self.start_time else "0",
-            "文章总数": self.db_manager.get_articles_stats().get('total', 0),
-            "今日新增": self.db_manager.get_articles_stats().get('today', 0)
+            "文章总数": stats.get('total', 0),
+            "今日新增": stats.get('today', 0)
         }
         
         return info
     
-    def _collect_one_article(self) -> Tuple[str, str, Dict[str, Any]]:
+    def _get_cached_stats(self) -> Dict[str, int]:
         """
-        获取单篇文章
+        获取文章统计（短时缓存）
+        
+        Returns:
+            Dict[str, int]: 统计信息
+        """
+        if self._stats_cache is None or time.monotonic() - self._stats_cache[0] >= STATS_CACHE_TTL:
+            return self._fetch_stats()
+        return self._stats_cache[1]
+    
+    def _fetch_stats(self) -> Dict[str, int]:
+        """
+        从数据库获取文章统计并更新缓存
         
         Returns:
+            Dict[str, int]: 统计信息
+        """
+        stats = self.db_manager.get_articles_stats()
+        self._stats_cache = (time.monotonic(), stats)
+        return stats
+    
+    def _invalidate_stats_cache(self) -> None:
+        """使文章统计缓存失效（文章数据变化后调用）"""
+        self._stats_cache = None
+    
+    def _collect_one_article(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """
+        获取单篇文章
+        
+        Yields:
             Tuple[str, str, Dict[str, Any]]: 状态文本、日志输出、运行信息
         """
         if self.is_running:
-            return "智能体已在运行中", log_capture.get_logs(), self._get_run_info()
-        
-        self.is_running = True
-        self.start_time = datetime.now()
+            yield "智能体已在运行中", log_capture.get_logs(), self._get_run_info()
+            return
         
         self.logger.info("开始获取单篇文章...")
         
-        try:
-            # 清空日志
-            log_capture.clear_logs()
-            
-            # 设置最大文章数为1
+        def collect_one():
+            # 设置最大文章数为1，运行结束后恢复
             original_max = self.config.agent.max_articles_per_run
             self.config.agent.max_articles_per_run = 1
-            
-            # 运行智能体
-            self.agent.run_news_collection()
-            
-            # 恢复设置
-            self.config.agent.max_articles_per_run = original_max
-            
-            self.is_running = False
-            
-            return "获取完成", log_capture.get_logs(), self._get_run_info()
-            
-        except Exception as e:
-            self.logger.error(f"获取单篇文章失败: {e}")
-            self.is_running = False
-            return f"获取失败: {str(e)}", log_capture.get_logs(), self._get_run_info()
+            try:
+                return self.agent.run_news_collection(self._stop_event)
+            finally:
+                self.config.agent.max_articles_per_run = original_max
+        
+        yield from self._run_in_background(
+            collect_one,
+            success_status="获取完成",
+            failure_label="获取单篇文章失败",
+            failure_status="获取失败"
+        )
     
     def _refresh_article_list(self) -> List[List[Any]]:
         """
@@ -454,20 +600,8 @@ class WebInterface:
         Returns:
             List[List[Any]]: 文章列表数据
         """
-        articles = self.db_manager.get_articles(limit=50)
-        
-        data = []
-        for article in articles:
-            data.append([
-                article.id,
-                article.title,
-                article.status,
-                article.source_type,
-                article.created_at.strftime("%Y-%m-%d %H:%M"),
-                round(article.quality_score, 2)
-            ])
-        
-        return data
+        rows = self.db_manager.list_articles_projection(limit=50)
+        return self._rows_to_table(rows)
     
     def _filter_articles(self, filter_value: str) -> List[List[Any]]:
         """
@@ -479,44 +613,73 @@ class WebInterface:
         Returns:
             List[List[Any]]: 过滤后的文章列表
         """
-        status_map = {
-            "全部": None,
-            "草稿": "draft",
-            "已发布": "published",
-            "已归档": "archived"
-        }
+        status = self._STATUS_MAP.get(filter_value)
         
-        status = status_map.get(filter_value)
-        
-        articles = self.db_manager.get_articles(status=status, limit=50)
+        rows = self.db_manager.list_articles_projection(status=status, limit=50)
+        return self._rows_to_table(rows)
+    
+    def _rows_to_table(self, rows: List[Any]) -> List[List[Any]]:
+        """
+        将文章投影行转换为列表展示数据
         
-        data = []
-        for article in articles:
-            data.append([
-                article.id,
-                article.title,
-                article.status,
-                article.source_type,
-                article.created_at.strftime("%Y-%m-%d %H:%M"),
-                round(article.quality_score, 2)
-            ])
+        Args:
+            rows: list_articles_projection返回的行
+            
+        Returns:
+            List[List[Any]]: 文章列表数据
+        """
+        table = [
+            [
+                row['id'],
+                row['title'],
+                row['status'],
+                row['source_type'],
+                _format_minute(row['created_at']),
+                round(row['quality_score'], 2)
+            ]
+            for row in rows
+        ]
+        
+        # 列表重新加载后丢弃旧的文章缓存
+        self._articles_cache.clear()
+        
+        return table
+    
+    def _get_article(self, article_id: int) -> Optional[Article]:
+        """
+        获取文章，优先使用缓存
         
-        return data
+        Args:
+            article_id: 文章ID
+            
+        Returns:
+            Optional[Article]: 文章对象
+        """
+        article = self._articles_cache.get(article_id)
+        if article is None:
+            article = self.db_manager.get_article(article_id)
+            if article:
+                self._articles_cache[article_id] = article
+        return article
     
-    def _select_article(self, evt: gr.SelectData) -> Tuple[int, str, str]:
+    def _select_article(self, table: List[List[Any]], evt: gr.SelectData) -> Tuple[int, str, str]:
         """
         选择文章
         
         Args:
+            table: 当前会话中显示的文章列表
             evt: 选择事件
             
         Returns:
             Tuple[int, str, str]: 文章ID、标题、内容
         """
+        # 从被点击行自身的ID列取文章ID
         row_index = evt.index[0]
-        article_id = self.article_list.value[row_index][0]
+        if row_index >= len(table) or table[row_index][0] in (None, ""):
+            return 0, "", "文章不存在"
+        article_id = int(table[row_index][0])
         
-        article = self.db_manager.get_article(article_id)
+        article = self._get_article(article_id)
         
         if article:
             return article.id, article.title, article.content
@@ -533,7 +696,12 @@ class WebInterface:
         Returns:
             Tuple[str, str]: 标题、内容
         """
-        article = self.db_manager.get_article(article_id)
+        # 0/空值表示未选择文章，无需查询数据库
+        if not article_id:
+            return "", "请选择文章"
+        article_id = int(article_id)
+        
+        article = self._get_article(article_id)
         
         if article:
             return article.title, article.content
@@ -544,7 +712,8 @@ class WebInterface:
         self, 
         article_id: int, 
         title: str, 
-        content: str
+        content: str,
+        table: List[List[Any]]
     ) -> List[List[Any]]:
         """
         保存文章修改
@@ -553,22 +722,38 @@ class WebInterface:
             article_id: 文章ID
             title: 标题
             content: 内容
+            table: 当前会话中显示的文章列表
             
         Returns:
             List[List[Any]]: 更新后的文章列表
         """
-        article = self.db_manager.get_article(article_id)
+        if not article_id:
+            return table
+        article_id = int(article_id)
+        
+        article = self._get_article(article_id)
         
         if article:
             article.title = title
             article.content = content
             article.updated_at = datetime.now()
             
-            self.db_manager.save_article(article)
+            try:
+                self.db_manager.save_article(article)
+            except Exception:
+                # 保存失败时丢弃已修改的缓存对象
+                self._articles_cache.pop(article_id, None)
+                raise
             
             self.logger.info(f"文章已更新: ID={article_id}")
+            
+            # 只更新列表中对应的一行，无需重新查询整个列表
+            for row in table:
+                if row[0] not in (None, "") and int(row[0]) == article_id:
+                    row[1] = title
+                    break
         
-        return self._refresh_article_list()
+        return table
     
     def _export_article(self, article_id: int) -> Optional[str]:
         """
@@ -580,22 +765,22 @@ class WebInterface:
         Returns:
             Optional[str]: 导出路径
         """
-        article = self.db_manager.get_article(article_id)
+        if not article_id:
+            return None
+        article_id = int(article_id)
+        
+        article = self._get_article(article_id)
         
         if not article:
             return None
         
-        # 创建导出目录
-        export_dir = "output/exports"
-        os.makedirs(export_dir, exist_ok=True)
-        
-        # 生成文件名
-        filename = f"{export_dir}/article_{article_id}_{int(time.time())}.md"
+        # 生成文件名（纳秒时间戳，避免连续导出时文件名冲突）
+        export_path = self._export_dir / f"article_{article_id}_{time.time_ns()}.md"
         
         # 写入文件
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(article.content)
+        export_path.write_text(article.content, encoding='utf-8')
         
+        filename = str(export_path)
         self.logger.info(f"文章已导出: {filename}")
         
         return filename
@@ -637,8 +822,8 @@ class WebInterface:
             # 保存到环境变量
             os.environ["OPENAI_API_KEY"] = api_key
             
-            # 重新初始化智能体
-            self.agent = AINewsAgent()
+            # 将更新后的配置应用到智能体
+            self.agent.reconfigure(self.config)
             
             self.logger.info("配置已更新")
             
@@ -657,7 +842,8 @@ class WebInterface:
         """
         try:
             self.logger.info("开始获取文章统计信息...")
-            stats = self.db_manager.get_articles_stats()
+            # 统计面板总是读取最新数据，同时刷新运行信息使用的缓存
+            stats = self._fetch_stats()
 
             result = {
                 "总文章数": stats.get('total', 0),
@@ -690,19 +876,11 @@ class WebInterface:
         """
         try:
             self.logger.info("开始获取来源分布数据...")
-            articles = self.db_manager.get_articles(limit=100)
-
-            source_counts = {}
-            for article in articles:
-                source = article.source_type or "未知来源"
-                if source in source_counts:
-                    source_counts[source] += 1
-                else:
-                    source_counts[source] = 1
+            source_counts = self.db_manager.source_counts(limit=100)
 
             # 如果没有数据，返回默认数据
             if not source_counts:
-                source_counts = {"暂无数据": 0}
+                return {**self._EMPTY_SOURCE_DISTRIBUTION}
 
             data = {
                 "来源": list(source_counts.keys()),
@@ -714,10 +892,7 @@ class WebInterface:
 
         except Exception as e:
             self.logger.error(f"获取来源分布数据失败: {e}")
-            return {
-                "来源": ["错误"],
-                "数量": [0]
-            }
+            return {**self._ERROR_SOURCE_DISTRIBUTION}
     
     def _refresh_stats(self) -> Tuple[Dict[str, Any], Dict[str, List[Any]]]:
         """
@@ -729,11 +904,12 @@ class WebInterface:
         try:
             self.logger.info("开始刷新统计信息...")
 
-            # 获取文章统计
-            article_stats = self._get_article_stats()
+            # 并行获取文章统计和来源分布
+            article_stats_future = self._stats_executor.submit(self._get_article_stats)
+            source_distribution_future = self._stats_executor.submit(self._get_source_distribution)
 
-            # 获取来源分布
-            source_distribution = self._get_source_distribution()
+            article_stats = article_stats_future.result()
+            source_distribution = source_distribution_future.result()
 
             self.logger.info("统计信息刷新完成")
             return article_stats, source_distribution
@@ -751,9 +927,4 @@ class WebInterface:
                 "今日新增": 0
             }
 
-            error_distribution = {
-                "来源": ["错误"],
-                "数量": [0]
-            }
-
-            return error_stats, error_distribution
+            return error_stats, {**self._ERROR_SOURCE_DISTRIBUTION}
@@ -8,7 +8,6 @@ Author: zengzhengtx
 
 import os
 import sys
-import json
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -21,31 +20,29 @@ from src.tools.wechat_formatter import WeChatFormatterTool
 from src.utils.validators import ContentFilter
 from src.utils.quality_control import QualityController
 from src.database.database import DatabaseManager
-from src.database.models import Article
+from src.database.models import Article, encode_tags
 from src.utils.datetime_utils import get_utc_now
 
 
+# 输出目录（在入口处创建一次）
+OUTPUT_DIR = "output"
+
+
 def print_header(title):
     """打印标题"""
-    print("\n" + "="*60)
-    print(f"  {title}")
-    print("="*60)
+    print(f"\n{'=' * 60}\n  {title}\n{'=' * 60}")
 
 
 def print_section(title):
     """打印章节标题"""
-    print(f"\n📋 {title}")
-    print("-" * 40)
+    print(f"\n📋 {title}\n{'-' * 40}")
 
 
-def create_realistic_news_items():
-    """创建真实的AI资讯项"""
-    print_section("创建真实AI资讯数据")
-    
-    news_items = [
-        NewsItem(
-            title="OpenAI发布GPT-4 Turbo：更快、更便宜、更强大",
-            content="""
+# 演示用的真实AI资讯数据（发布时间在创建资讯项时统一填充）
+REALISTIC_NEWS = (
+    dict(
+        title="OpenAI发布GPT-4 Turbo：更快、更便宜、更强大",
+        content="""
             OpenAI在其首届开发者大会上发布了GPT-4 Turbo，这是GPT-4的升级版本，具有多项重大改进。
             
             主要特性包括：
@@ -67,15 +64,14 @@ def create_realistic_news_items():
             
             开发者可以通过OpenAI API立即开始使用GPT-4 Turbo，无需等待列表。
             """,
-            url="https://openai.com/blog/new-models-and-developer-products-announced-at-devday",
-            source="web_search",
-            published_date=get_utc_now(),
-            tags=['OpenAI', 'GPT-4', 'API', 'AI'],
-            score=0.95
-        ),
-        NewsItem(
-            title="Google发布Gemini：多模态AI的新里程碑",
-            content="""
+        url="https://openai.com/blog/new-models-and-developer-products-announced-at-devday",
+        source="web_search",
+        tags=['OpenAI', 'GPT-4', 'API', 'AI'],
+        score=0.95
+    ),
+    dict(
+        title="Google发布Gemini：多模态AI的新里程碑",
+        content="""
             Google DeepMind发布了其最新的大型语言模型Gemini，声称在多项基准测试中超越了GPT-4。
             
             **三个版本满足不同需求**
@@ -97,15 +93,14 @@ def create_realistic_news_items():
             
             Gemini Pro已经在Google Bard中上线，Gemini Ultra将在明年初发布。
             """,
-            url="https://blog.google/technology/ai/google-gemini-ai/",
-            source="web_search",
-            published_date=get_utc_now(),
-            tags=['Google', 'Gemini', 'multimodal', 'AI'],
-            score=0.92
-        ),
-        NewsItem(
-            title="Anthropic推出Claude 2.1：200K上下文窗口的突破",
-            content="""
+        url="https://blog.google/technology/ai/google-gemini-ai/",
+        source="web_search",
+        tags=['Google', 'Gemini', 'multimodal', 'AI'],
+        score=0.92
+    ),
+    dict(
+        title="Anthropic推出Claude 2.1：200K上下文窗口的突破",
+        content="""
             Anthropic发布了Claude 2.1，这是其AI助手Claude的最新版本，带来了令人印象深刻的改进。
             
             **史无前例的上下文长度**
@@ -128,15 +123,14 @@ def create_realistic_news_items():
             
             这一发布标志着长上下文AI模型的新时代，为处理复杂、长篇内容开辟了新的可能性。
             """,
-            url="https://www.anthropic.com/index/claude-2-1",
-            source="web_search",
-            published_date=get_utc_now(),
-            tags=['Anthropic', 'Claude', 'context-window', 'AI'],
-            score=0.88
-        ),
-        NewsItem(
-            title="Meta开源Code Llama：专为代码生成优化的大模型",
-            content="""
+        url="https://www.anthropic.com/index/claude-2-1",
+        source="web_search",
+        tags=['Anthropic', 'Claude', 'context-window', 'AI'],
+        score=0.88
+    ),
+    dict(
+        title="Meta开源Code Llama：专为代码生成优化的大模型",
+        content="""
             Meta发布了Code Llama，这是基于Llama 2的代码专用大型语言模型，专门为代码生成和理解任务进行了优化。
             
             **三种模型规模**
@@ -165,15 +159,14 @@ def create_realistic_news_items():
             
             这一发布为开发者社区提供了强大的代码生成工具，有望加速软件开发的自动化进程。
             """,
-            url="https://ai.meta.com/blog/code-llama-large-language-model-coding/",
-            source="web_search",
-            published_date=get_utc_now(),
-            tags=['Meta', 'Code-Llama', 'open-source', 'coding'],
-            score=0.85
-        ),
-        NewsItem(
-            title="Stability AI发布SDXL Turbo：实时图像生成的新突破",
-            content="""
+        url="https://ai.meta.com/blog/code-llama-large-language-model-coding/",
+        source="web_search",
+        tags=['Meta', 'Code-Llama', 'open-source', 'coding'],
+        score=0.85
+    ),
+    dict(
+        title="Stability AI发布SDXL Turbo：实时图像生成的新突破",
+        content="""
             Stability AI发布了SDXL Turbo，这是一个革命性的文本到图像生成模型，能够在单步推理中生成高质量图像。
             
             **实时生成能力**
@@ -202,18 +195,31 @@ def create_realistic_news_items():
             
             这一发布标志着AI图像生成从"慢而精"向"快而精"的重要转变。
             """,
-            url="https://stability.ai/news/sdxl-turbo",
-            source="web_search",
-            published_date=get_utc_now(),
-            tags=['Stability-AI', 'SDXL-Turbo', 'image-generation', 'real-time'],
-            score=0.82
-        )
+        url="https://stability.ai/news/sdxl-turbo",
+        source="web_search",
+        tags=['Stability-AI', 'SDXL-Turbo', 'image-generation', 'real-time'],
+        score=0.82
+    )
+)
+
+
+def create_realistic_news_items():
+    """创建真实的AI资讯项"""
+    print_section("创建真实AI资讯数据")
+    
+    now = get_utc_now()
+    # 标签列表逐条复制，避免后续处理修改到模块常量
+    news_items = [
+        NewsItem(**dict(fields, tags=list(fields['tags'])), published_date=now)
+        for fields in REALISTIC_NEWS
     ]
     
     print(f"✅ 创建了 {len(news_items)} 条真实AI资讯")
-    for i, item in enumerate(news_items, 1):
-        print(f"   {i}. {item.title}")
-        print(f"      来源: {item.source} | 分数: {item.score}")
+    # 资讯列表拼接后一次输出
+    print("\n".join(
+        f"   {i}. {item.title}\n      来源: {item.source} | 分数: {item.score}"
+        for i, item in enumerate(news_items, 1)
+    ))
     
     return news_items
 
@@ -225,6 +231,7 @@ def demo_complete_workflow():
     # 初始化日志
     logger = init_logging()
     logger.info("开始完整工作流程演示...")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     try:
         # 1. 创建真实资讯数据
@@ -254,12 +261,8 @@ def demo_complete_workflow():
         print_section("质量控制")
         quality_controller = QualityController()
         
-        formatted_item = NewsItem(
-            title=selected_item.title,
+        formatted_item = selected_item.replace(
             content=formatted_content,
-            url=selected_item.url,
-            source=selected_item.source,
-            published_date=selected_item.published_date,
             tags=selected_item.tags + ["formatted"]
         )
         
@@ -284,7 +287,7 @@ def demo_complete_workflow():
             source_type=formatted_item.source,
             status='draft',
             quality_score=validation_result['score'],
-            tags=json.dumps(formatted_item.tags, ensure_ascii=False)
+            tags=encode_tags(formatted_item.tags)
         )
         
         article_id = db_manager.save_article(article)
@@ -292,8 +295,7 @@ def demo_complete_workflow():
         
         # 6. 保存到文件
         print_section("导出文章")
-        output_path = "output/stable_demo_article.md"
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        output_path = os.path.join(OUTPUT_DIR, "stable_demo_article.md")
         
         with open(output_path, "w", encoding="utf-8") as f:
             f.write(formatted_content)
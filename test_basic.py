@@ -8,6 +8,8 @@ Author: zengzhengtx
 
 import sys
 import os
+import sqlite3
+import tempfile
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -15,7 +17,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.agent.config import load_config
 from src.utils.logger import init_logging
 from src.database.database import DatabaseManager
-from src.database.models import Article
+from src.database.models import Article, DatabaseSchema
 
 
 def test_config():
@@ -82,6 +84,163 @@ def test_database(config):
     return db_manager
 
 
+def test_article_counts_with_null_values():
+    """测试计数表兼容NULL状态和无法解析的创建时间（含旧数据库迁移）"""
+    print("\n🧮 测试文章计数表...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "legacy.db")
+        
+        # 构造计数表引入前的旧数据库，包含NULL状态和无法解析创建时间的文章
+        conn = sqlite3.connect(db_path)
+        conn.execute(DatabaseSchema.CREATE_ARTICLES_TABLE)
+        conn.executemany(
+            "INSERT INTO articles (title, content, status, created_at) VALUES (?, ?, ?, ?)",
+            [
+                ("NULL状态文章", "内容", None, "2024-01-01T08:00:00"),
+                ("无效时间文章", "内容", "draft", "not-a-date"),
+                ("正常文章", "内容", "draft", "2024-01-02T08:00:00"),
+            ]
+        )
+        conn.commit()
+        conn.close()
+        
+        # 迁移时回填计数表
+        db_manager = DatabaseManager(db_path)
+        stats = db_manager.get_articles_stats()
+        assert stats['total'] == 3, stats
+        assert stats['status_None'] == 1 and stats['status_draft'] == 2, stats
+        print(f"✅ 旧数据库迁移成功: {stats}")
+        
+        # 迁移后新增同类文章
+        null_status_article = Article(
+            title="新NULL状态文章",
+            content="内容",
+            summary="摘要",
+            source_url="https://example.com/null-status",
+            source_type="test",
+            status=None
+        )
+        db_manager.save_article(null_status_article)
+        with db_manager.get_connection() as conn:
+            conn.execute(
+                "INSERT INTO articles (title, content, status, created_at) VALUES (?, ?, ?, ?)",
+                ("新无效时间文章", "内容", "draft", "not-a-date")
+            )
+            conn.commit()
+        
+        stats = db_manager.get_articles_stats()
+        assert stats['total'] == 5, stats
+        assert stats['status_None'] == 2 and stats['status_draft'] == 3, stats
+        
+        # 删除后计数同步减少
+        db_manager.delete_article(null_status_article.id)
+        stats = db_manager.get_articles_stats()
+        assert stats['total'] == 4 and stats['status_None'] == 1, stats
+        print(f"✅ NULL值文章增删计数正确: {stats}")
+        
+        db_manager.close()
+    
+    return True
+
+
+def test_save_articles_ids():
+    """测试批量保存跨多个分页时，回填的文章ID与各自标题一一对应"""
+    print("\n📦 测试批量保存文章ID...")
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = DatabaseManager(os.path.join(temp_dir, "batch.db"))
+        
+        # 先保存并删除一篇文章，使批量保存的起始ID不从1开始
+        seed_article = Article(
+            title="种子文章",
+            content="内容",
+            summary="摘要",
+            source_url="https://example.com/seed",
+            source_type="test"
+        )
+        db_manager.save_article(seed_article)
+        db_manager.delete_article(seed_article.id)
+        
+        article_count = DatabaseManager.ARTICLE_INSERT_PAGE_SIZE * 2 + 7
+        articles = [
+            Article(
+                title=f"批量文章{i}",
+                content=f"批量内容{i}",
+                summary=f"批量摘要{i}",
+                source_url=f"https://example.com/batch/{i}",
+                source_type="test"
+            )
+            for i in range(article_count)
+        ]
+        article_ids = db_manager.save_articles(articles)
+        
+        assert article_ids == [article.id for article in articles]
+        assert len(set(article_ids)) == article_count
+        for article in articles:
+            saved_article = db_manager.get_article(article.id)
+            assert saved_article is not None and saved_article.title == article.title, article.id
+        print(f"✅ 批量保存 {article_count} 篇文章，ID与标题一一对应")
+        
+        db_manager.close()
+    
+    return True
+
+
+def test_search_articles():
+    """测试全文索引搜索与LIKE逐行匹配结果一致（含中文、引号、短关键词及增删改后）"""
+    print("\n🔍 测试文章搜索...")
+    
+    def like_ids(db_manager, keyword):
+        with db_manager.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT id FROM articles WHERE title LIKE ? OR content LIKE ? OR summary LIKE ?",
+                (f"%{keyword}%", f"%{keyword}%", f"%{keyword}%")
+            ).fetchall()
+        return {row[0] for row in rows}
+    
+    def check_keywords(db_manager, keywords):
+        for keyword in keywords:
+            found_ids = {article.id for article in db_manager.search_articles(keyword, limit=100)}
+            assert found_ids == like_ids(db_manager, keyword), keyword
+    
+    keywords = ["人工智能", "大模型", '"大模型"', "开源框架", "AI", "智能", "GPT-4o", "不存在的词"]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_manager = DatabaseManager(os.path.join(temp_dir, "search.db"))
+        
+        articles = [
+            Article(title="人工智能发布新模型", content="研究团队称\"大模型\"能力显著提升", summary="AI动态",
+                    source_url="https://example.com/s/1", source_type="test"),
+            Article(title="开源框架更新", content="新版本支持GPT-4o接入", summary="开源框架的新特性",
+                    source_url="https://example.com/s/2", source_type="test"),
+            Article(title="大模型训练成本下降", content="智能芯片价格走低", summary="行业观察",
+                    source_url="https://example.com/s/3", source_type="test"),
+            Article(title="ai应用落地", content="企业开始部署人工智能助手", summary="",
+                    source_url="https://example.com/s/4", source_type="test"),
+        ]
+        db_manager.save_articles(articles)
+        check_keywords(db_manager, keywords)
+        
+        # 修改后搜索结果随之更新
+        articles[0].title = "机器学习发布新版本"
+        articles[0].content = "研究团队称能力显著提升"
+        db_manager.save_article(articles[0])
+        check_keywords(db_manager, keywords)
+        assert articles[0].id not in {article.id for article in db_manager.search_articles("人工智能")}
+        
+        # 删除后不再被搜索到
+        db_manager.delete_article(articles[1].id)
+        check_keywords(db_manager, keywords)
+        assert not db_manager.search_articles("开源框架")
+        
+        print(f"✅ 搜索结果与LIKE匹配一致（全文索引: {'启用' if db_manager._search_index_enabled else '未启用'}）")
+        
+        db_manager.close()
+    
+    return True
+
+
 def test_tools():
     """测试工具基类"""
     print("\n🔨 测试工具基类...")
@@ -123,6 +282,9 @@ def main():
         
         # 测试数据库
         db_manager = test_database(config)
+        test_article_counts_with_null_values()
+        test_save_articles_ids()
+        test_search_articles()
         
         # 测试工具
         test_tools()
@@ -22,6 +22,10 @@ from src.tools.wechat_formatter import WeChatFormatterTool
 from src.utils.quality_control import QualityController
 
 
+# 输出目录（在入口处创建一次）
+OUTPUT_DIR = "output"
+
+
 def create_test_news_item():
     """创建测试资讯项"""
     print("\n📰 创建测试资讯项...")
@@ -84,12 +88,9 @@ def test_content_rewriter():
         print(f"{rewritten_content[:200]}...")
         
         # 创建改写后的资讯项
-        rewritten_item = NewsItem(
+        rewritten_item = news_item.replace(
             title=rewritten_title,
             content=rewritten_content,
-            url=news_item.url,
-            source=news_item.source,
-            published_date=news_item.published_date,
             tags=news_item.tags + ["rewritten"]
         )
         
@@ -121,12 +122,8 @@ def test_wechat_formatter(news_item):
         print(f"{formatted_content[:200]}...")
         
         # 创建格式化后的资讯项
-        formatted_item = NewsItem(
-            title=news_item.title,
+        formatted_item = news_item.replace(
             content=formatted_content,
-            url=news_item.url,
-            source=news_item.source,
-            published_date=news_item.published_date,
             tags=news_item.tags + ["formatted"]
         )
         
@@ -169,14 +166,11 @@ def test_quality_control(original_item, rewritten_item):
         return None
 
 
-def save_result_to_file(item, filename="output/rewritten_article.md"):
+def save_result_to_file(item, filename=os.path.join(OUTPUT_DIR, "rewritten_article.md")):
     """保存结果到文件"""
     print(f"\n💾 保存结果到文件: {filename}...")
     
     try:
-        # 确保目录存在
-        os.makedirs(os.path.dirname(filename), exist_ok=True)
-        
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(f"# {item.title}\n\n")
             f.write(item.content)
@@ -195,6 +189,7 @@ def main():
     
     # 初始化日志
     logger = init_logging()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     try:
         # 创建测试资讯项
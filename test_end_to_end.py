@@ -8,7 +8,6 @@ Author: zengzhengtx
 
 import sys
 import os
-import time
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -21,6 +20,10 @@ from src.database.database import DatabaseManager
 from src.tools.base_tool import NewsItem
 
 
+# 输出目录（在入口处创建一次）
+OUTPUT_DIR = "output"
+
+
 def test_agent_initialization():
     """测试智能体初始化"""
     print("\n🤖 测试智能体初始化...")
@@ -44,25 +47,24 @@ def test_agent_initialization():
                 self.quality_controller = QualityController()
 
             def _save_articles(self, news_items):
-                articles = []
-                for item in news_items:
-                    from src.database.models import Article
-                    import json
+                from src.database.models import Article, encode_tags
 
-                    article = Article(
+                articles = [
+                    Article(
                         title=item.title,
                         content=item.content,
-                        summary=item.content[:200] + "...",
+                        summary=item.summary or item.content[:200] + "...",
                         source_url=item.url,
                         source_type=item.source,
                         status='draft',
                         quality_score=item.score,
-                        tags=json.dumps(item.tags, ensure_ascii=False)
+                        tags=encode_tags(item.tags)
                     )
+                    for item in news_items
+                ]
 
-                    article_id = self.db_manager.save_article(article)
-                    article.id = article_id
-                    articles.append(article)
+                # 单个事务批量写入，并回填文章ID
+                self.db_manager.save_articles(articles)
 
                 return articles
 
@@ -149,17 +151,12 @@ def test_content_rewriting(agent, news_items):
         rewritten_items = []
         for item in news_items:
             # 模拟改写
-            rewritten_item = NewsItem(
+            rewritten_item = item.replace(
                 title=f"【AI前沿】{item.title}",
                 content=f"# {item.title}\n\n{item.content}\n\n这是一篇由AI智能体改写的文章，原始内容来自: {item.url}",
-                url=item.url,
-                source=item.source,
-                published_date=item.published_date,
-                tags=item.tags + ["rewritten"],
-                score=item.score
+                tags=item.tags + ["rewritten"]
             )
             rewritten_items.append(rewritten_item)
-            time.sleep(0.5)  # 模拟API调用延迟
         
         print(f"✅ 内容改写成功，改写后数量: {len(rewritten_items)}")
         return rewritten_items
@@ -188,14 +185,9 @@ def test_wechat_formatting(agent, news_items):
                 add_emojis=True
             )
             
-            formatted_item = NewsItem(
-                title=item.title,
+            formatted_item = item.replace(
                 content=formatted_content,
-                url=item.url,
-                source=item.source,
-                published_date=item.published_date,
-                tags=item.tags + ["formatted"],
-                score=item.score
+                tags=item.tags + ["formatted"]
             )
             formatted_items.append(formatted_item)
         
@@ -203,10 +195,10 @@ def test_wechat_formatting(agent, news_items):
         
         # 保存一个示例文件
         if formatted_items:
-            os.makedirs("output", exist_ok=True)
-            with open("output/formatted_example.md", "w", encoding="utf-8") as f:
+            example_path = os.path.join(OUTPUT_DIR, "formatted_example.md")
+            with open(example_path, "w", encoding="utf-8") as f:
                 f.write(formatted_items[0].content)
-            print(f"✅ 示例文件已保存到 output/formatted_example.md")
+            print(f"✅ 示例文件已保存到 {example_path}")
         
         return formatted_items
     
@@ -227,10 +219,9 @@ def test_database_operations(agent, news_items):
         # 获取数据库管理器
         db_manager = agent.db_manager
         
-        # 测试保存文章
-        for item in news_items:
-            article_id = agent._save_articles([item])[0].id
-            print(f"✅ 文章保存成功，ID: {article_id}")
+        # 测试保存文章（整批一次写入）
+        for article in agent._save_articles(news_items):
+            print(f"✅ 文章保存成功，ID: {article.id}")
         
         # 测试获取文章
         articles = db_manager.get_articles(limit=10)
@@ -253,6 +244,7 @@ def main():
     
     # 初始化日志
     logger = init_logging()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     
     try:
         # 测试智能体初始化
@@ -8,7 +8,7 @@ Author: zengzhengtx
 
 import sys
 import os
-import json
+import itertools
 from datetime import datetime
 
 # 添加项目根目录到Python路径
@@ -20,56 +20,68 @@ from src.tools.base_tool import NewsItem
 from src.utils.validators import ContentFilter
 
 
-def create_mock_news_data():
-    """创建模拟资讯数据"""
+# 模拟资讯模板（发布时间在生成数据时统一填充）
+MOCK_NEWS_TEMPLATES = (
+    {
+        'title': 'OpenAI发布GPT-4.5：性能大幅提升',
+        'content': 'OpenAI今日宣布发布GPT-4.5模型，该模型在多项基准测试中表现出色，推理能力和代码生成能力都有显著提升。新模型采用了改进的Transformer架构，训练数据规模达到了前所未有的水平。',
+        'url': 'https://example.com/gpt-4.5-release',
+        'source': 'web_search',
+        'tags': ['AI', 'GPT', 'OpenAI'],
+        'score': 0.9
+    },
+    {
+        'title': 'Meta推出新一代AI芯片，专为大模型训练优化',
+        'content': 'Meta公司发布了专门为大型语言模型训练设计的AI芯片，该芯片采用7nm工艺，具有超高的计算密度和能效比。预计将大幅降低AI模型训练成本。',
+        'url': 'https://example.com/meta-ai-chip',
+        'source': 'web_search',
+        'tags': ['AI', 'Meta', 'chip'],
+        'score': 0.8
+    },
+    {
+        'title': 'arXiv论文：Attention机制的新突破',
+        'content': '研究人员提出了一种新的注意力机制，能够显著提高Transformer模型的效率。该方法在保持性能的同时，将计算复杂度从O(n²)降低到O(n log n)。',
+        'url': 'https://arxiv.org/abs/2024.12345',
+        'source': 'arxiv_cs.AI',
+        'tags': ['arxiv', 'attention', 'transformer'],
+        'score': 0.85
+    },
+    {
+        'title': 'GitHub热门：新的开源大模型框架',
+        'content': '一个新的开源大模型训练框架在GitHub上获得了超过10k星标。该框架支持分布式训练，内存优化，并提供了简洁的API接口。',
+        'url': 'https://github.com/example/llm-framework',
+        'source': 'github_machine-learning',
+        'tags': ['github', 'open-source', 'framework'],
+        'score': 0.75
+    },
+    {
+        'title': 'Hugging Face发布新的多模态模型',
+        'content': 'Hugging Face在其模型库中发布了一个新的多模态模型，能够同时处理文本、图像和音频输入。该模型在多个基准测试中达到了SOTA性能。',
+        'url': 'https://huggingface.co/example/multimodal-model',
+        'source': 'huggingface_models',
+        'tags': ['huggingface', 'multimodal', 'SOTA'],
+        'score': 0.88
+    }
+)
+
+
+def create_mock_news_data(n=len(MOCK_NEWS_TEMPLATES)):
+    """
+    创建模拟资讯数据
+
+    Args:
+        n: 资讯条数，超过模板数量时循环使用模板
+
+    Returns:
+        list: 模拟资讯项列表
+    """
     print("\n📰 创建模拟资讯数据...")
 
+    # 直接由模板构造资讯项，不经过字典和ISO字符串中转
+    now = datetime.now()
     mock_data = [
-        {
-            'title': 'OpenAI发布GPT-4.5：性能大幅提升',
-            'content': 'OpenAI今日宣布发布GPT-4.5模型，该模型在多项基准测试中表现出色，推理能力和代码生成能力都有显著提升。新模型采用了改进的Transformer架构，训练数据规模达到了前所未有的水平。',
-            'url': 'https://example.com/gpt-4.5-release',
-            'source': 'web_search',
-            'published_date': datetime.now().isoformat(),
-            'tags': ['AI', 'GPT', 'OpenAI'],
-            'score': 0.9
-        },
-        {
-            'title': 'Meta推出新一代AI芯片，专为大模型训练优化',
-            'content': 'Meta公司发布了专门为大型语言模型训练设计的AI芯片，该芯片采用7nm工艺，具有超高的计算密度和能效比。预计将大幅降低AI模型训练成本。',
-            'url': 'https://example.com/meta-ai-chip',
-            'source': 'web_search',
-            'published_date': (datetime.now()).isoformat(),
-            'tags': ['AI', 'Meta', 'chip'],
-            'score': 0.8
-        },
-        {
-            'title': 'arXiv论文：Attention机制的新突破',
-            'content': '研究人员提出了一种新的注意力机制，能够显著提高Transformer模型的效率。该方法在保持性能的同时，将计算复杂度从O(n²)降低到O(n log n)。',
-            'url': 'https://arxiv.org/abs/2024.12345',
-            'source': 'arxiv_cs.AI',
-            'published_date': datetime.now().isoformat(),
-            'tags': ['arxiv', 'attention', 'transformer'],
-            'score': 0.85
-        },
-        {
-            'title': 'GitHub热门：新的开源大模型框架',
-            'content': '一个新的开源大模型训练框架在GitHub上获得了超过10k星标。该框架支持分布式训练，内存优化，并提供了简洁的API接口。',
-            'url': 'https://github.com/example/llm-framework',
-            'source': 'github_machine-learning',
-            'published_date': datetime.now().isoformat(),
-            'tags': ['github', 'open-source', 'framework'],
-            'score': 0.75
-        },
-        {
-            'title': 'Hugging Face发布新的多模态模型',
-            'content': 'Hugging Face在其模型库中发布了一个新的多模态模型，能够同时处理文本、图像和音频输入。该模型在多个基准测试中达到了SOTA性能。',
-            'url': 'https://huggingface.co/example/multimodal-model',
-            'source': 'huggingface_models',
-            'published_date': datetime.now().isoformat(),
-            'tags': ['huggingface', 'multimodal', 'SOTA'],
-            'score': 0.88
-        }
+        NewsItem(**dict(template, tags=list(template['tags'])), published_date=now)
+        for template in itertools.islice(itertools.cycle(MOCK_NEWS_TEMPLATES), n)
     ]
 
     print(f"✅ 创建了 {len(mock_data)} 条模拟资讯")
@@ -89,10 +101,12 @@ def test_news_item_creation():
             tags=["AI", "test"]
         )
 
-        print(f"✅ NewsItem创建成功: {news_item.title}")
-        print(f"   ID: {news_item.id}")
-        print(f"   来源: {news_item.source}")
-        print(f"   发布时间: {news_item.published_date}")
+        print(
+            f"✅ NewsItem创建成功: {news_item.title}\n"
+            f"   ID: {news_item.id}\n"
+            f"   来源: {news_item.source}\n"
+            f"   发布时间: {news_item.published_date}"
+        )
 
         return True
 
@@ -109,41 +123,25 @@ def test_content_filter(mock_data):
         print("❌ 没有资讯数据可供筛选")
         return []
 
-    # 转换为NewsItem对象
-    news_items = []
-
-    for result in mock_data:
-        try:
-            item = NewsItem(
-                title=result['title'],
-                content=result['content'],
-                url=result['url'],
-                source=result['source'],
-                published_date=datetime.fromisoformat(result['published_date']),
-                tags=result.get('tags', []),
-                score=result.get('score', 0.0)
-            )
-            news_items.append(item)
-        except Exception as e:
-            print(f"转换资讯项失败: {e}")
-
-    print(f"原始资讯项数量: {len(news_items)}")
+    print(f"原始资讯项数量: {len(mock_data)}")
 
     # 创建内容筛选器
     content_filter = ContentFilter(duplicate_threshold=0.8, min_quality_score=0.5)
 
     # 筛选和去重
-    filtered_items = content_filter.filter_and_dedupe(news_items)
+    filtered_items = content_filter.filter_and_dedupe(mock_data)
 
     print(f"✅ 筛选后资讯项数量: {len(filtered_items)}")
     print("\n📊 筛选后的前3条资讯:")
 
-    for i, item in enumerate(filtered_items[:3], 1):
-        print(f"  {i}. {item.title}")
-        print(f"     来源: {item.source}")
-        print(f"     质量分数: {item.score:.2f}")
-        print(f"     发布日期: {item.published_date.strftime('%Y-%m-%d')}")
-        print()
+    # 前3条资讯拼接后一次输出
+    print("".join(
+        f"  {i}. {item.title}\n"
+        f"     来源: {item.source}\n"
+        f"     质量分数: {item.score:.2f}\n"
+        f"     发布日期: {item.published_date.strftime('%Y-%m-%d')}\n\n"
+        for i, item in enumerate(filtered_items[:3], 1)
+    ), end="")
 
     return filtered_items
 